@@ -0,0 +1,145 @@
+import csv
+import random
+import sys
+from multiprocessing import Pool
+
+import degrees
+
+# Number of sources that share one bit-parallel BFS sweep
+WIDTH = 64
+
+
+def bit_parallel_bfs(graph, sources):
+    """
+    Runs a BFS from every person index in `sources` (at most WIDTH)
+    in a single sweep, tracking one bit per source in each mask.
+
+    Returns a list with, for each source, its histogram: a list whose
+    element d - 1 counts the people exactly d degrees away.
+    """
+    person_offsets, person_movies = graph.person_offsets, graph.person_movies
+    movie_offsets, movie_stars = graph.movie_offsets, graph.movie_stars
+
+    # seen[p] has bit b set once source b has reached person p
+    seen = {}
+    frontier = {}
+    for b, s in enumerate(sources):
+        seen[s] = seen.get(s, 0) | 1 << b
+        frontier[s] = frontier.get(s, 0) | 1 << b
+
+    histograms = [[] for _ in sources]
+    while frontier:
+
+        # Every movie of a frontier person is reached by that person's sources
+        movie_masks = {}
+        for p, mask in frontier.items():
+            for m in person_movies[person_offsets[p]:person_offsets[p + 1]]:
+                movie_masks[m] = movie_masks.get(m, 0) | mask
+
+        # Every star of such a movie is newly reached by the sources not
+        # already seen there
+        next_frontier = {}
+        for m, mask in movie_masks.items():
+            for q in movie_stars[movie_offsets[m]:movie_offsets[m + 1]]:
+                new = mask & ~seen.get(q, 0)
+                if new:
+                    seen[q] = seen.get(q, 0) | new
+                    next_frontier[q] = next_frontier.get(q, 0) | new
+
+        if not next_frontier:
+            break
+        counts = [0] * len(sources)
+        for mask in next_frontier.values():
+            while mask:
+                low = mask & -mask
+                counts[low.bit_length() - 1] += 1
+                mask ^= low
+        for b, count in enumerate(counts):
+            if count:
+                histograms[b].append(count)
+        frontier = next_frontier
+    return histograms
+
+
+def analyze(sources):
+    """
+    Returns (person_id, histogram) for a batch of source indices.
+    """
+    graph = degrees.graph
+    histograms = bit_parallel_bfs(graph, sources)
+    return [
+        (graph.person_ids[s], histogram)
+        for s, histogram in zip(sources, histograms)
+    ]
+
+
+def init_worker(directory):
+    """
+    Loads the data in a worker process, unless it was inherited by fork.
+    """
+    if degrees.graph is None:
+        degrees.load_data(directory, compact=True)
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    flags = dict(
+        arg[2:].partition("=")[::2] for arg in sys.argv[1:]
+        if arg.startswith("--")
+    )
+    if len(args) > 1 or not set(flags) <= {"sample", "seed", "workers", "histogram"}:
+        sys.exit("Usage: python analytics.py [directory] [--sample=N] "
+                 "[--seed=N] [--workers=N] [--histogram=FILE]")
+    directory = args[0] if args else "large"
+    workers = int(flags.get("workers") or 1)
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(directory, compact=True)
+    print("Data loaded.", file=sys.stderr)
+    graph = degrees.graph
+
+    # Sample among people who starred in something
+    offsets = graph.person_offsets
+    sources = [p for p in range(len(graph.person_ids)) if offsets[p + 1] > offsets[p]]
+    if flags.get("sample"):
+        rng = random.Random(int(flags.get("seed") or 0))
+        sources = sorted(rng.sample(sources, min(int(flags["sample"]), len(sources))))
+    batches = [sources[i:i + WIDTH] for i in range(0, len(sources), WIDTH)]
+
+    # One row per source: its eccentricity, how many people it reaches,
+    # and its histogram as space-separated counts for 1, 2, ... degrees
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["person_id", "eccentricity", "reachable", "histogram"])
+    total = []
+
+    def write(results):
+        for person_id, histogram in results:
+            writer.writerow([
+                person_id, len(histogram), sum(histogram),
+                " ".join(str(count) for count in histogram)
+            ])
+            for d, count in enumerate(histogram):
+                if d == len(total):
+                    total.append(0)
+                total[d] += count
+
+    if workers > 1:
+        with Pool(workers, initializer=init_worker, initargs=(directory,)) as pool:
+            for results in pool.imap_unordered(analyze, batches):
+                write(results)
+    else:
+        for batch in batches:
+            write(analyze(batch))
+
+    if flags.get("histogram"):
+        with open(flags["histogram"], "w", encoding="utf-8", newline="") as f:
+            histogram_writer = csv.writer(f)
+            histogram_writer.writerow(["degrees", "pairs"])
+            for d, count in enumerate(total, start=1):
+                histogram_writer.writerow([d, count])
+    for d, count in enumerate(total, start=1):
+        print(f"{d} degrees: {count} pairs", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import csv
+import sys
+from multiprocessing import Pool
+
+import degrees
+
+
+def read_queries(filename):
+    """
+    Reads (source name, target name) pairs, one CSV row per query,
+    and returns a list of (line number, source name, target name).
+    """
+    queries = []
+    with open(filename, encoding="utf-8", newline="") as f:
+        for line, row in enumerate(csv.reader(f), start=1):
+            if not row or row[0].startswith("#"):
+                continue
+            if len(row) != 2:
+                sys.exit(f"{filename}:{line}: expected two names")
+            queries.append((line, row[0].strip(), row[1].strip()))
+    return queries
+
+
+def resolve(name):
+    """
+    Returns (person_id, error) for a name; ambiguous names are an error
+    since there is nobody to ask which person was meant.
+    """
+    person_ids = degrees.person_ids_for_name(name)
+    if not person_ids:
+        return None, "person not found"
+    if len(person_ids) > 1:
+        return None, "ambiguous name"
+    return person_ids[0], None
+
+
+def group_by_source(queries):
+    """
+    Resolves every query and groups them by source person_id.
+
+    Returns (jobs, errors): jobs is a list of (source, [(line, target)]),
+    errors a list of (line, message) for queries that cannot be searched.
+    """
+    groups = {}
+    errors = []
+    for line, source_name, target_name in queries:
+        source, error = resolve(source_name)
+        if error is None:
+            target, error = resolve(target_name)
+        if error is not None:
+            errors.append((line, error))
+            continue
+        groups.setdefault(source, []).append((line, target))
+    return list(groups.items()), errors
+
+
+def answer(job):
+    """
+    Answers every query of one source from a single BFS tree and
+    returns a list of (line, path) results.
+    """
+    source, targets = job
+    paths = degrees.shortest_paths_from(source, [target for _, target in targets])
+    return [(line, paths[target]) for line, target in targets]
+
+
+def init_worker(directory, compact):
+    """
+    Loads the data in a worker process, unless it was inherited by fork.
+    """
+    if degrees.graph is None and not degrees.people:
+        degrees.load_data(directory, compact=compact)
+
+
+def format_path(path):
+    """
+    Returns a path as "movie_id:person_id" steps joined by spaces.
+    """
+    return " ".join(f"{movie_id}:{person_id}" for movie_id, person_id in path)
+
+
+def write_answers(writer, answers):
+    """
+    Writes one CSV row per (line, path) answer.
+    """
+    for line, path in answers:
+        if path is None:
+            writer.writerow([line, "", "", "not connected"])
+        else:
+            writer.writerow([line, len(path), format_path(path), ""])
+    sys.stdout.flush()
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    flags = dict(
+        arg[2:].partition("=")[::2] for arg in sys.argv[1:]
+        if arg.startswith("--")
+    )
+    if not 1 <= len(args) <= 2 or not set(flags) <= {"compact", "workers"}:
+        sys.exit("Usage: python batch.py queries.csv [directory] "
+                 "[--compact] [--workers=N]")
+    directory = args[1] if len(args) == 2 else "large"
+    compact = "compact" in flags
+    workers = int(flags.get("workers") or 1)
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(directory, compact=compact)
+    print("Data loaded.", file=sys.stderr)
+
+    jobs, errors = group_by_source(read_queries(args[0]))
+
+    # Results are written as soon as each source's tree is finished,
+    # so the output is ordered by completion rather than by line
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["line", "degrees", "path", "error"])
+    for line, error in errors:
+        writer.writerow([line, "", "", error])
+
+    if workers > 1:
+        with Pool(workers, initializer=init_worker,
+                  initargs=(directory, compact)) as pool:
+            results = pool.imap_unordered(answer, jobs)
+            for answers in results:
+                write_answers(writer, answers)
+    else:
+        for job in jobs:
+            write_answers(writer, answer(job))
+
+
+if __name__ == "__main__":
+    main()
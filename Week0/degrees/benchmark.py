@@ -0,0 +1,82 @@
+import random
+import sys
+import time
+
+import degrees
+
+
+def run_search(search, pairs):
+    """
+    Runs `search` on every (source, target) pair and returns
+    a list of (path length, explored people, seconds) tuples.
+    """
+    results = []
+    for source, target in pairs:
+        stats = {"explored": 0}
+        start = time.perf_counter()
+        path = search(source, target, stats=stats)
+        elapsed = time.perf_counter() - start
+        length = None if path is None else len(path)
+        results.append((length, stats["explored"], elapsed))
+    return results
+
+
+def summarize(name, results):
+    """
+    Prints total explored people and wall time for one search.
+    """
+    explored = sum(result[1] for result in results)
+    elapsed = sum(result[2] for result in results)
+    print(f"{name:>14}: {explored:>10} people explored, {elapsed:8.3f}s")
+
+
+def cast_person_ids():
+    """
+    Returns the sorted ids of everyone who starred in at least one movie.
+    """
+    graph = degrees.graph
+    if graph is not None:
+        offsets = graph.person_offsets
+        return [
+            person_id for p, person_id in enumerate(graph.person_ids)
+            if offsets[p + 1] > offsets[p]
+        ]
+    return sorted(
+        person_id for person_id, person in degrees.people.items()
+        if person["movies"]
+    )
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    flags = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    if len(args) > 3 or not flags <= {"--compact"}:
+        sys.exit("Usage: python benchmark.py [directory] [pairs] [seed] "
+                 "[--compact]")
+    directory = args[0] if len(args) > 0 else "large"
+    count = int(args[1]) if len(args) > 1 else 100
+    seed = int(args[2]) if len(args) > 2 else 0
+
+    print("Loading data...")
+    degrees.load_data(directory, compact="--compact" in flags)
+    print("Data loaded.")
+
+    # Only pick people who starred in something, so searches do real work
+    person_ids = cast_person_ids()
+    rng = random.Random(seed)
+    pairs = [tuple(rng.sample(person_ids, 2)) for _ in range(count)]
+
+    forward = run_search(degrees.shortest_path, pairs)
+    bidirectional = run_search(degrees.bidirectional_shortest_path, pairs)
+
+    for (source, target), one, other in zip(pairs, forward, bidirectional):
+        if one[0] != other[0]:
+            sys.exit(f"Mismatch for {source} -> {target}: {one[0]} != {other[0]}")
+
+    print(f"{count} random pairs from {directory}")
+    summarize("BFS", forward)
+    summarize("Bidirectional", bidirectional)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
-import csv
+import os
 import sys
 
+from graph import load_graph
+from ingest import Ingest
+from nameindex import NameIndex
+from pathcache import MISSING, PathCache
+from snapshot import fingerprint
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -12,64 +17,121 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# CompactGraph holding all of the above when loaded with compact=True
+graph = None
 
-def load_data(directory):
+# Identifies the loaded CSV files, so cached results can be invalidated
+dataset = None
+
+# PathCache used by cached_shortest_path, once enabled
+path_cache = None
+
+# (NameIndex, person_ids) over `people`, built on first use
+name_index = None
+
+
+def load_data(directory, compact=False, cache=True,
+              min_year=None, max_cast_size=None):
     """
     Load data from CSV files into memory.
+
+    With `compact`, the data is loaded into a CSR `graph` instead
+    of the `names`, `people` and `movies` dictionaries, reusing a
+    binary snapshot of the CSV files when `cache` is set.
+
+    Movies before `min_year` or with more than `max_cast_size` stars are
+    skipped, along with everyone left without a movie. Returns a dict
+    counting the dropped people, movies and stars rows.
     """
+    global graph, dataset, name_index
+    name_index = None
+    names.clear()
+    people.clear()
+    movies.clear()
+    filters = {"min_year": min_year, "max_cast_size": max_cast_size}
+    dataset = [os.path.abspath(directory), fingerprint(directory), filters]
+    if compact:
+        graph, dropped = load_graph(directory, cache=cache, **filters)
+        return dropped
+    graph = None
+
+    ingest = Ingest(directory, **filters)
+
     # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+    for person_id, name, birth in ingest.people():
+        people[person_id] = {
+            "name": name,
+            "birth": birth,
+            "movies": set()
+        }
+        if name.lower() not in names:
+            names[name.lower()] = {person_id}
+        else:
+            names[name.lower()].add(person_id)
 
     # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
+    for movie_id, title, year in ingest.movies():
+        movies[movie_id] = {
+            "title": title,
+            "year": year,
+            "stars": set()
+        }
 
     # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    for person_id, movie_id in ingest.stars():
+        people[person_id]["movies"].add(movie_id)
+        movies[movie_id]["stars"].add(person_id)
+
+    return ingest.dropped
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    flags = dict(
+        arg.partition("=")[::2] for arg in sys.argv[1:]
+        if arg.startswith("--")
+    )
+    if len(args) > 1 or not set(flags) <= {
+        "--bidirectional", "--compact", "--cache", "--min-year", "--max-cast"
+    }:
+        sys.exit("Usage: python degrees.py [directory] "
+                 "[--bidirectional] [--compact] [--cache=FILE] "
+                 "[--min-year=YEAR] [--max-cast=STARS]")
+    directory = args[0] if args else "large"
+    min_year = int(flags["--min-year"]) if flags.get("--min-year") else None
+    max_cast_size = int(flags["--max-cast"]) if flags.get("--max-cast") else None
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    dropped = load_data(directory, compact="--compact" in flags,
+                        min_year=min_year, max_cast_size=max_cast_size)
     print("Data loaded.")
+    if min_year is not None or max_cast_size is not None:
+        import resource
+
+        # ru_maxrss is in kilobytes on Linux but in bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak //= 1024 * 1024 if sys.platform == "darwin" else 1024
+        print(f"Dropped {dropped['people']} people, {dropped['movies']} "
+              f"movies, {dropped['stars']} stars rows; peak RSS {peak} MB.")
+    if flags.get("--cache"):
+        enable_path_cache(filename=flags["--cache"])
 
-    source = person_id_for_name(input("Name: "))
+    name = input("Name: ")
+    source = person_id_for_name(name)
     if source is None:
-        sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+        sys.exit(not_found_message(name))
+    name = input("Name: ")
+    target = person_id_for_name(name)
     if target is None:
-        sys.exit("Person not found.")
+        sys.exit(not_found_message(name))
 
-    path = shortest_path(source, target)
+    if "--bidirectional" in flags:
+        path = bidirectional_shortest_path(source, target)
+    else:
+        path = cached_shortest_path(source, target)
+    if path_cache is not None and path_cache.filename is not None:
+        path_cache.save()
 
     if path is None:
         print("Not connected.")
@@ -78,19 +140,24 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_record(path[i][1])["name"]
+            person2 = person_record(path[i + 1][1])["name"]
+            movie = movie_record(path[i + 1][0])["title"]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    If `stats` is a dict, the number of explored people is stored
+    under "explored".
     """
+    if graph is not None:
+        return graph.shortest_path(source, target, stats=stats)
 
     # TODO
     
@@ -105,6 +172,8 @@ def shortest_path(source, target):
     while not q.empty():
         parent = q.frontier[0]
         explored.add(parent.state)
+        if stats is not None:
+            stats["explored"] = len(explored)
         #print([(x.state + ",") for x in q.frontier])
         # Find all movies the person was in, then generate list of all people in casted
         parent_movies = people[parent.state]["movies"]
@@ -143,18 +212,169 @@ def shortest_path(source, target):
     # Use QueueFrontier to parse through nodes until target is found while
 
 
+def bidirectional_shortest_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing one BFS frontier
+    from each end and stopping where they meet.
+
+    If no possible path, returns None.
+
+    If `stats` is a dict, the number of explored people is stored
+    under "explored".
+    """
+    # Like shortest_path, which only finds people other than the source
+    if source == target:
+        return None
+
+    # Each side maps a discovered person to (movie_id, person_id) of the
+    # step that reached it, pointing back towards that side's root
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+    explored = 0
+
+    while forward_frontier and backward_frontier:
+
+        # Expand the smaller frontier by one full level
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, seen, other = forward_frontier, forward, backward
+        else:
+            frontier, seen, other = backward_frontier, backward, forward
+
+        next_frontier = []
+        meeting = None
+        for person_id in frontier:
+            explored += 1
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id in seen:
+                    continue
+                seen[neighbor_id] = (movie_id, person_id)
+                next_frontier.append(neighbor_id)
+                if neighbor_id in other and meeting is None:
+                    meeting = neighbor_id
+
+        if frontier is forward_frontier:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+        if meeting is not None:
+            if stats is not None:
+                stats["explored"] = explored
+            return _join_paths(forward, backward, meeting)
+
+    if stats is not None:
+        stats["explored"] = explored
+    return None
+
+
+def _join_paths(forward, backward, meeting):
+    """
+    Joins the two half paths of a bidirectional search that meet
+    at `meeting` into a single list of (movie_id, person_id) pairs.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, previous_id = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = previous_id
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, next_id = backward[person_id]
+        path.append((movie_id, next_id))
+        person_id = next_id
+    return path
+
+
+def enable_path_cache(maxsize=1024, filename=None):
+    """
+    Enables the PathCache used by cached_shortest_path, persisted
+    to `filename` if given, and returns it.
+    """
+    global path_cache
+    path_cache = PathCache(maxsize=maxsize, filename=filename)
+    return path_cache
+
+
+def cached_shortest_path(source, target):
+    """
+    Returns shortest_path(source, target), answered from the path cache
+    when enabled; a cached B -> A path also answers A -> B.
+    """
+    if path_cache is None:
+        return shortest_path(source, target)
+    path_cache.validate(dataset)
+    path = path_cache.get(source, target)
+    if path is MISSING:
+        path = shortest_path(source, target)
+        path_cache.put(source, target, path)
+    return path
+
+
+def shortest_paths_from(source, targets):
+    """
+    Returns a dict mapping every person_id in `targets` to the shortest
+    list of (movie_id, person_id) pairs from the source, or None.
+
+    All targets are answered from one BFS tree rooted at the source,
+    which stops growing once every target has been reached.
+    """
+    if graph is not None:
+        return graph.shortest_paths_from(source, targets)
+
+    remaining = set(targets) - {source}
+    parents = {source: None}
+    frontier = QueueFrontier()
+    frontier.add(Node(state=source, parent=None, action=None))
+    while not frontier.empty() and remaining:
+        node = frontier.remove()
+        for movie_id, person_id in neighbors_for_person(node.state):
+            if person_id not in parents:
+                parents[person_id] = (movie_id, node.state)
+                frontier.add(Node(state=person_id, parent=node, action=movie_id))
+                remaining.discard(person_id)
+
+    paths = {}
+    for target in targets:
+        if target not in parents or target == source:
+            paths[target] = None
+            continue
+        path = []
+        person_id = target
+        while parents[person_id] is not None:
+            movie_id, previous_id = parents[person_id]
+            path.append((movie_id, person_id))
+            person_id = previous_id
+        paths[target] = path[::-1]
+    return paths
+
+
+def person_ids_for_name(name):
+    """
+    Returns every IMDB id for a person's name, without prompting.
+    """
+    if graph is not None:
+        return graph.person_ids_for_name(name)
+    return list(names.get(name.lower(), set()))
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
+            person = person_record(person_id)
             name = person["name"]
             birth = person["birth"]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
@@ -169,11 +389,54 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def complete_name(prefix, limit=10):
+    """
+    Returns up to `limit` person_ids whose names start with `prefix`.
+    """
+    index, person_ids = _name_index()
+    return [person_ids[i] for i in index.prefix(prefix, limit)]
+
+
+def search_names(query, limit=10):
+    """
+    Returns up to `limit` person_ids ranked by how well their names
+    match `query`: exact, then prefix, then typo-tolerant matches.
+    """
+    index, person_ids = _name_index()
+    return [person_ids[i] for i in index.search(query, limit)]
+
+
+def _name_index():
+    """
+    Returns the (NameIndex, person_ids) pair for the loaded data.
+    """
+    global name_index
+    if graph is not None:
+        return graph.names, graph.person_ids
+    if name_index is None:
+        person_ids = list(people)
+        index = NameIndex.build([people[person_id]["name"] for person_id in person_ids])
+        name_index = (index, person_ids)
+    return name_index
+
+
+def not_found_message(name):
+    """
+    Returns the message for an unknown name, with suggestions if any.
+    """
+    suggestions = [person_record(person_id)["name"] for person_id in search_names(name, 3)]
+    if not suggestions:
+        return "Person not found."
+    return f"Person not found. Did you mean: {', '.join(suggestions)}?"
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -182,5 +445,23 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+def person_record(person_id):
+    """
+    Returns the name, birth, movies dictionary for a person_id.
+    """
+    if graph is not None:
+        return graph.person(person_id)
+    return people[person_id]
+
+
+def movie_record(movie_id):
+    """
+    Returns the title, year, stars dictionary for a movie_id.
+    """
+    if graph is not None:
+        return graph.movie(movie_id)
+    return movies[movie_id]
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,350 @@
+import csv
+import io
+import os
+import shutil
+import sys
+
+import pytest
+import analytics
+import batch
+import degrees
+import landmarks
+import snapshot
+from ingest import Ingest
+from landmarks import LandmarkIndex
+from pathcache import MISSING, PathCache, reverse_path
+from util import Node, QueueFrontier
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+
+
+@pytest.fixture
+def small(tmp_path):
+    """
+    A copy of the small dataset, so snapshots are not written next to it.
+    """
+    directory = tmp_path / "small"
+    shutil.copytree(SMALL, directory)
+    return str(directory)
+
+
+def all_pairs():
+    degrees.load_data(SMALL)
+    person_ids = sorted(degrees.people)
+    return [(s, t) for s in person_ids for t in person_ids]
+
+
+def check_path(source, target, path):
+    """
+    Asserts that path is a chain of shared movies from source to target.
+    """
+    person_id = source
+    for movie_id, next_id in path:
+        assert person_id in degrees.movies[movie_id]["stars"]
+        assert next_id in degrees.movies[movie_id]["stars"]
+        person_id = next_id
+    assert person_id == target
+
+
+def dict_paths():
+    degrees.load_data(SMALL)
+    return {(s, t): degrees.shortest_path(s, t) for s, t in all_pairs()}
+
+
+def test_searches_match_breadth_first_search():
+    expected = dict_paths()
+    for (s, t), path in expected.items():
+        bidirectional = degrees.bidirectional_shortest_path(s, t)
+        if path is None:
+            assert bidirectional is None
+        else:
+            assert len(bidirectional) == len(path)
+            check_path(s, t, bidirectional)
+    assert expected[("102", "102")] is None
+    assert expected[("102", "914612")] is None
+    assert len(expected[("102", "129")]) == 1
+
+
+def test_compact_graph_matches_dicts():
+    expected = dict_paths()
+    degrees.load_data(SMALL, compact=True, cache=False)
+    for (s, t), path in expected.items():
+        compact = degrees.shortest_path(s, t)
+        assert (compact is None) == (path is None)
+        if path is not None:
+            assert len(compact) == len(path)
+    assert degrees.person_ids_for_name("tom hanks") == ["158"]
+    assert degrees.person_record("102")["name"] == "Kevin Bacon"
+
+    # Checking the compact paths against the dicts needs them reloaded
+    compact = {pair: degrees.shortest_path(*pair) for pair in expected}
+    degrees.load_data(SMALL)
+    for (s, t), path in compact.items():
+        if path is not None:
+            check_path(s, t, path)
+
+
+def test_shortest_paths_from_matches_shortest_path():
+    degrees.load_data(SMALL)
+    targets = sorted(degrees.people)
+    for compact in (False, True):
+        degrees.load_data(SMALL, compact=compact, cache=False)
+        paths = degrees.shortest_paths_from("102", targets)
+        for target in targets:
+            path = degrees.shortest_path("102", target)
+            assert (paths[target] is None) == (path is None)
+            if path is not None:
+                assert len(paths[target]) == len(path)
+
+
+def test_landmark_search_matches_breadth_first_search():
+    expected = dict_paths()
+    degrees.load_data(SMALL, compact=True, cache=False)
+    index = LandmarkIndex.build(degrees.graph, k=3)
+    for (s, t), path in expected.items():
+        found = index.shortest_path(s, t)
+        assert (found is None) == (path is None)
+        if path is not None:
+            assert len(found) == len(path)
+        assert index.distance(s, t) == (None if path is None else len(path))
+
+
+def test_landmarks_beyond_one_byte(tmp_path):
+    """
+    Checks distances along a chain of people too long to store in a byte.
+    """
+    people = 300
+    with open(tmp_path / "people.csv", "w", encoding="utf-8") as f:
+        f.write("id,name,birth\n")
+        f.writelines(f'{p},"Person {p}",1950\n' for p in range(people + 1))
+    with open(tmp_path / "movies.csv", "w", encoding="utf-8") as f:
+        f.write("id,title,year\n")
+        f.writelines(f'{m},"Movie {m}",2000\n' for m in range(people))
+    with open(tmp_path / "stars.csv", "w", encoding="utf-8") as f:
+        f.write("person_id,movie_id\n")
+        f.writelines(f"{m},{m}\n{m + 1},{m}\n" for m in range(people - 1))
+
+    # Person 300 is in no movie
+    degrees.load_data(str(tmp_path), compact=True, cache=False)
+    first = degrees.graph.person_index("0")
+    index = LandmarkIndex(degrees.graph, [first],
+                          [landmarks.bfs_distances(degrees.graph, first)])
+    assert index.bounds(first, degrees.graph.person_index("299")) == (254, None)
+    assert index.distance("0", "299") == 299
+    assert index.distance("10", "290") == 280
+    assert index.distance("0", "300") is None
+    assert index.distance("5", "5") is None
+
+
+def plain_histograms():
+    """
+    Returns each person id's histogram of degrees to everyone else,
+    counted from breadth-first shortest paths.
+    """
+    degrees.load_data(SMALL)
+    histograms = {}
+    for s, t in all_pairs():
+        path = degrees.shortest_path(s, t)
+        histogram = histograms.setdefault(s, [])
+        if path is not None:
+            histogram.extend([0] * (len(path) - len(histogram)))
+            histogram[len(path) - 1] += 1
+    return histograms
+
+
+def test_bit_parallel_bfs_matches_breadth_first_search(small, monkeypatch, capsys):
+    expected = plain_histograms()
+    degrees.load_data(SMALL, compact=True, cache=False)
+    graph = degrees.graph
+    sources = list(range(len(graph.person_ids)))
+    for batch in (sources, sources[:5], sources[5:]):
+        for s, histogram in zip(batch, analytics.bit_parallel_bfs(graph, batch)):
+            assert histogram == expected[graph.person_ids[s]]
+
+    # Batches of 3 leave a smaller last batch, run with and without workers
+    monkeypatch.setattr(analytics, "WIDTH", 3)
+    assert len(sources) % 3 != 0
+    for workers in ("1", "2"):
+        monkeypatch.setattr(sys, "argv", ["analytics.py", small, f"--workers={workers}"])
+        analytics.main()
+        rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+        people = {row["person_id"] for row in rows}
+        assert people == {person_id for person_id in expected
+                          if degrees.person_record(person_id)["movies"]}
+        for row in rows:
+            histogram = expected[row["person_id"]]
+            assert int(row["eccentricity"]) == len(histogram)
+            assert int(row["reachable"]) == sum(histogram)
+            assert row["histogram"] == " ".join(str(count) for count in histogram)
+
+
+def run_batch(monkeypatch, capsys, *args):
+    """
+    Runs batch.py with the given arguments and returns its CSV rows.
+    """
+    monkeypatch.setattr(sys, "argv", ["batch.py", *args])
+    batch.main()
+    return list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+
+
+def test_batch_queries(small, tmp_path, monkeypatch, capsys):
+    with open(os.path.join(small, "people.csv"), "a", encoding="utf-8") as f:
+        f.write('1,"Tom Hanks",1990\n')
+    queries = str(tmp_path / "queries.csv")
+    with open(queries, "w", encoding="utf-8") as f:
+        f.write("# source,target\n"
+                "Kevin Bacon,Tom Cruise\n"
+                "\n"
+                "kevin bacon, Mandy Patinkin\n"
+                "Kevin Bacon,Nobody\n"
+                "Tom Hanks,Kevin Bacon\n"
+                "Kevin Bacon,Emma Watson\n"
+                "Tom Cruise,Tom Cruise\n")
+    assert batch.read_queries(queries)[:2] == [
+        (2, "Kevin Bacon", "Tom Cruise"), (4, "kevin bacon", "Mandy Patinkin")
+    ]
+
+    degrees.load_data(small)
+    jobs, errors = batch.group_by_source(batch.read_queries(queries))
+    assert jobs == [("102", [(2, "129"), (4, "1597"), (7, "914612")]),
+                    ("129", [(8, "129")])]
+    assert errors == [(5, "person not found"), (6, "ambiguous name")]
+
+    expected = {
+        "2": ["1", ""],
+        "4": ["3", ""],
+        "5": ["", "person not found"],
+        "6": ["", "ambiguous name"],
+        "7": ["", "not connected"],
+        "8": ["", "not connected"],
+    }
+    for args in ([], ["--workers=2"], ["--compact", "--workers=2"]):
+        rows = run_batch(monkeypatch, capsys, queries, small, *args)
+        assert {row["line"]: [row["degrees"], row["error"]] for row in rows} == expected
+        for row in rows:
+            if row["path"]:
+                assert len(row["path"].split(" ")) == int(row["degrees"])
+
+
+def test_batch_rejects_malformed_queries(tmp_path):
+    queries = str(tmp_path / "queries.csv")
+    with open(queries, "w", encoding="utf-8") as f:
+        f.write("Kevin Bacon,Tom Cruise\nKevin Bacon\n")
+    with pytest.raises(SystemExit, match="queries.csv:2: expected two names"):
+        batch.read_queries(queries)
+
+
+def test_snapshot_round_trip(small):
+    degrees.load_data(small, compact=True)
+    path = os.path.join(small, snapshot.FILENAME)
+    assert os.path.exists(path)
+    built = degrees.shortest_path("102", "1597")
+    assert snapshot.read_snapshot(small, Ingest(small).filters()) is not None
+
+    degrees.load_data(small, compact=True)
+    assert degrees.shortest_path("102", "1597") == built
+    assert degrees.person_record("1597")["name"] == "Mandy Patinkin"
+
+    # Other filters do not reuse the snapshot
+    assert snapshot.read_snapshot(small, Ingest(small, min_year=1990).filters()) is None
+
+
+def test_snapshot_goes_stale(small):
+    degrees.load_data(small, compact=True)
+    with open(os.path.join(small, "people.csv"), "a", encoding="utf-8") as f:
+        f.write('1,"New Person",2000\n')
+    assert snapshot.read_snapshot(small, Ingest(small).filters()) is None
+    degrees.load_data(small, compact=True)
+    assert degrees.person_ids_for_name("new person") == ["1"]
+
+
+def test_corrupt_snapshot_is_rebuilt(small):
+    degrees.load_data(small, compact=True)
+    path = os.path.join(small, snapshot.FILENAME)
+    with open(path, "rb") as f:
+        data = f.read()
+    for length in (0, 10, 40, len(data) // 2, len(data) * 3 // 4):
+        with open(path, "wb") as f:
+            f.write(data[:length])
+        assert snapshot.read_snapshot(small, Ingest(small).filters()) is None
+        degrees.load_data(small, compact=True)
+        assert len(degrees.shortest_path("102", "129")) == 1
+
+
+def test_filter_counts(small):
+    assert degrees.load_data(small) == {"people": 0, "movies": 0, "stars": 0}
+    dropped = degrees.load_data(small, min_year=1990)
+    assert dropped["movies"] == 2
+    assert all(int(movie["year"]) >= 1990 for movie in degrees.movies.values())
+    assert all(person["movies"] for person in degrees.people.values())
+    assert degrees.load_data(small, compact=True, min_year=1990) == dropped
+
+
+def test_unknown_people_in_stars_are_dropped(small):
+    with open(os.path.join(small, "stars.csv"), "a", encoding="utf-8") as f:
+        f.write("999999,104257\n")
+    for options in ({}, {"min_year": 1990}, {"max_cast_size": 10, "compact": True}):
+        dropped = degrees.load_data(small, cache=False, **options)
+        assert dropped["stars"] >= 1
+        assert len(degrees.shortest_path("102", "129")) == 1
+
+
+def test_path_cache_reverses_paths():
+    degrees.load_data(SMALL)
+    cache = PathCache(maxsize=4)
+    path = degrees.shortest_path("1597", "102")
+    cache.put("1597", "102", path)
+    assert cache.get("1597", "102") == path
+    reverse = cache.get("102", "1597")
+    assert reverse == reverse_path("1597", path)
+    check_path("102", "1597", reverse)
+    assert cache.get("102", "129") is MISSING
+    cache.put("102", "914612", None)
+    assert cache.get("914612", "102") is None
+
+
+def test_path_cache_evicts_least_recently_used():
+    cache = PathCache(maxsize=2)
+    cache.put("1", "2", [("m", "2")])
+    cache.put("1", "3", [("m", "3")])
+    cache.get("1", "2")
+    cache.put("1", "4", [("m", "4")])
+    assert len(cache) == 2
+    assert cache.get("1", "3") is MISSING
+    assert cache.get("1", "2") == [("m", "2")]
+
+
+def test_path_cache_round_trip(tmp_path):
+    filename = str(tmp_path / "paths.json")
+    cache = PathCache(maxsize=2, filename=filename)
+    cache.validate(["dataset"])
+    cache.put("1", "2", [("m", "2")])
+    cache.put("1", "3", None)
+    cache.save()
+    loaded = PathCache(maxsize=2, filename=filename)
+    loaded.validate(["dataset"])
+    assert loaded.get("2", "1") == [("m", "1")]
+    assert loaded.get("1", "3") is None
+    loaded.validate(["other"])
+    assert len(loaded) == 0
+    assert len(PathCache(maxsize=0, filename=filename)) == 0
+    assert len(PathCache(maxsize=1, filename=filename)) == 1
+
+
+def test_queue_frontier():
+    frontier = QueueFrontier()
+    for state in ("a", "b", "a"):
+        frontier.add(Node(state=state, parent=None, action=None))
+    assert frontier.contains_state("a")
+    assert frontier.remove().state == "a"
+    assert frontier.contains_state("a")
+    assert frontier.remove().state == "b"
+    assert frontier.remove().state == "a"
+    assert frontier.empty() and not frontier.contains_state("a")
+
+
+def test_name_search():
+    for compact in (False, True):
+        degrees.load_data(SMALL, compact=compact, cache=False)
+        assert degrees.complete_name("tom") == ["129", "158"]
+        assert degrees.search_names("kevn bacon")[0] == "102"
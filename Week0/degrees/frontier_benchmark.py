@@ -0,0 +1,42 @@
+import sys
+import time
+
+from util import Node, StackFrontier, QueueFrontier
+
+
+def run(frontier_class, count):
+    """
+    Pushes `count` nodes through a frontier, checking membership
+    before every add the way a search does, and returns seconds taken.
+    """
+    frontier = frontier_class()
+    start = time.perf_counter()
+
+    # Keep the frontier around half full, so removes and lookups
+    # operate on a large container rather than an empty one
+    window = count // 2
+    for state in range(count):
+        if not frontier.contains_state(state):
+            frontier.add(Node(state=state, parent=None, action=None))
+        if state >= window:
+            frontier.remove()
+    while not frontier.empty():
+        frontier.remove()
+
+    return time.perf_counter() - start
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python frontier_benchmark.py [nodes]")
+    count = int(sys.argv[1]) if len(sys.argv) == 2 else 2_000_000
+
+    for frontier_class in (StackFrontier, QueueFrontier):
+        elapsed = run(frontier_class, count)
+        rate = count / elapsed
+        print(f"{frontier_class.__name__:>14}: {count} nodes in "
+              f"{elapsed:6.3f}s ({rate:,.0f} nodes/s)")
+
+
+if __name__ == "__main__":
+    main()
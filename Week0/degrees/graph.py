@@ -0,0 +1,294 @@
+from array import array
+from bisect import bisect_left
+
+from ingest import Ingest
+from nameindex import NameIndex
+from snapshot import read_snapshot, write_snapshot
+
+
+class CompactGraph():
+    """
+    Person <-> movie bipartite graph stored as CSR arrays.
+
+    People and movies are interned to dense ints in sorted id order, so
+    an IMDb id is found by binary search and every adjacency list is a
+    slice of one flat array instead of a Python set.
+    """
+
+    # Attributes written to and read back from a snapshot
+    FIELDS = (
+        "person_ids", "person_names", "person_births",
+        "movie_ids", "movie_titles", "movie_years",
+        "person_offsets", "person_movies",
+        "movie_offsets", "movie_stars",
+        "name_order", "trigram_keys", "trigram_offsets", "trigram_postings"
+    )
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies,
+                 movie_offsets, movie_stars,
+                 name_order, trigram_keys, trigram_offsets, trigram_postings):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+
+        # Movies of person p are person_movies[person_offsets[p]:person_offsets[p + 1]]
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+
+        # Stars of movie m are movie_stars[movie_offsets[m]:movie_offsets[m + 1]]
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+
+        # Prefix and trigram index over person names
+        self.name_order = name_order
+        self.trigram_keys = trigram_keys
+        self.trigram_offsets = trigram_offsets
+        self.trigram_postings = trigram_postings
+        self.names = NameIndex(
+            person_names, name_order,
+            trigram_keys, trigram_offsets, trigram_postings
+        )
+
+    def fields(self):
+        """
+        Returns a dict of the attributes listed in FIELDS.
+        """
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def person_index(self, person_id):
+        """
+        Returns the dense index of a person id, or None if unknown.
+        """
+        i = bisect_left(self.person_ids, person_id)
+        if i < len(self.person_ids) and self.person_ids[i] == person_id:
+            return i
+        return None
+
+    def movie_index(self, movie_id):
+        """
+        Returns the dense index of a movie id, or None if unknown.
+        """
+        i = bisect_left(self.movie_ids, movie_id)
+        if i < len(self.movie_ids) and self.movie_ids[i] == movie_id:
+            return i
+        return None
+
+    def person(self, person_id):
+        """
+        Returns a dictionary of: name, birth, movies (a set of movie_ids),
+        matching the entries of `degrees.people`.
+        """
+        p = self.person_index(person_id)
+        start, end = self.person_offsets[p], self.person_offsets[p + 1]
+        return {
+            "name": self.person_names[p],
+            "birth": self.person_births[p],
+            "movies": {self.movie_ids[m] for m in self.person_movies[start:end]}
+        }
+
+    def movie(self, movie_id):
+        """
+        Returns a dictionary of: title, year, stars (a set of person_ids),
+        matching the entries of `degrees.movies`.
+        """
+        m = self.movie_index(movie_id)
+        start, end = self.movie_offsets[m], self.movie_offsets[m + 1]
+        return {
+            "title": self.movie_titles[m],
+            "year": self.movie_years[m],
+            "stars": {self.person_ids[p] for p in self.movie_stars[start:end]}
+        }
+
+    def person_ids_for_name(self, name):
+        """
+        Returns the list of person ids whose lowercase name is `name.lower()`.
+        """
+        return [self.person_ids[p] for p in self.names.exact(name)]
+
+    def neighbors(self, p):
+        """
+        Yields (movie index, person index) pairs for people
+        who starred with person index `p`.
+        """
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_stars = self.movie_offsets, self.movie_stars
+        for m in person_movies[person_offsets[p]:person_offsets[p + 1]]:
+            for q in movie_stars[movie_offsets[m]:movie_offsets[m + 1]]:
+                yield m, q
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        return {
+            (self.movie_ids[m], self.person_ids[q])
+            for m, q in self.neighbors(self.person_index(person_id))
+        }
+
+    def shortest_path(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, or None.
+
+        If `stats` is a dict, the number of explored people is stored
+        under "explored".
+        """
+        return self.shortest_paths_from(source, [target], stats=stats)[target]
+
+    def shortest_paths_from(self, source, targets, stats=None):
+        """
+        Returns a dict mapping every person id in `targets` to the shortest
+        list of (movie_id, person_id) pairs from the source, or None,
+        using a single BFS tree grown until every target is reached.
+
+        If `stats` is a dict, the number of explored people is stored
+        under "explored".
+        """
+        s = self.person_index(source)
+        remaining = {self.person_index(target) for target in targets}
+        remaining.discard(s)
+
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_stars = self.movie_offsets, self.movie_stars
+
+        # Maps each discovered person to the (movie, person) that reached it
+        parents = {s: None}
+        seen_movies = set()
+        frontier = [s]
+        explored = 0
+
+        while frontier and remaining:
+            next_frontier = []
+            for p in frontier:
+                explored += 1
+                for m in person_movies[person_offsets[p]:person_offsets[p + 1]]:
+
+                    # Every star of a movie is reached the first time the
+                    # movie is seen, so no movie needs expanding twice
+                    if m in seen_movies:
+                        continue
+                    seen_movies.add(m)
+                    for q in movie_stars[movie_offsets[m]:movie_offsets[m + 1]]:
+                        if q not in parents:
+                            parents[q] = (m, p)
+                            next_frontier.append(q)
+                            remaining.discard(q)
+                    if not remaining:
+                        break
+                if not remaining:
+                    break
+            frontier = next_frontier
+
+        if stats is not None:
+            stats["explored"] = explored
+
+        paths = {}
+        for target in targets:
+            q = self.person_index(target)
+            if q not in parents or q == s:
+                paths[target] = None
+                continue
+            path = []
+            while parents[q] is not None:
+                m, p = parents[q]
+                path.append((self.movie_ids[m], self.person_ids[q]))
+                q = p
+            paths[target] = path[::-1]
+        return paths
+
+
+def _csr(count, pairs):
+    """
+    Builds (offsets, indices) arrays for `count` rows from
+    an array of (row, column) pairs stored flat.
+    """
+    offsets = array("i", bytes(4 * (count + 1)))
+    for row in pairs[::2]:
+        offsets[row + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    indices = array("i", bytes(4 * (len(pairs) // 2)))
+    cursor = array("i", offsets[:-1])
+    for i in range(0, len(pairs), 2):
+        row = pairs[i]
+        indices[cursor[row]] = pairs[i + 1]
+        cursor[row] += 1
+    return offsets, indices
+
+
+def load_graph(directory, cache=True, min_year=None, max_cast_size=None):
+    """
+    Load data from CSV files into a CompactGraph, filtered as
+    described by `Ingest`, and return (graph, dropped row counts).
+
+    With `cache`, a binary snapshot next to the CSV files is reused
+    while they and the filters are unchanged, and written after
+    parsing them otherwise.
+    """
+    ingest = Ingest(directory, min_year=min_year, max_cast_size=max_cast_size)
+    if cache:
+        snapshot = read_snapshot(directory, ingest.filters())
+        if snapshot is not None and set(snapshot[0]) == set(CompactGraph.FIELDS):
+            fields, dropped = snapshot
+            return CompactGraph(**fields), dropped
+
+    graph = _parse_graph(ingest)
+    if cache:
+        try:
+            write_snapshot(
+                directory, graph.fields(), ingest.filters(), ingest.dropped
+            )
+        except OSError:
+            pass
+    return graph, ingest.dropped
+
+
+def _parse_graph(ingest):
+    """
+    Parses the rows streamed by `ingest` into a CompactGraph.
+    """
+    # Load people
+    rows = sorted(ingest.people())
+    person_ids = [row[0] for row in rows]
+    person_names = [row[1] for row in rows]
+    person_births = [row[2] for row in rows]
+
+    # Load movies
+    rows = sorted(ingest.movies())
+    movie_ids = [row[0] for row in rows]
+    movie_titles = [row[1] for row in rows]
+    movie_years = [row[2] for row in rows]
+    del rows
+
+    # Load stars as flat (person, movie) and (movie, person) index pairs
+    person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+    movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+    person_pairs = array("i")
+    movie_pairs = array("i")
+    for person_id, movie_id in ingest.stars():
+        p = person_index[person_id]
+        m = movie_index[movie_id]
+        person_pairs.extend((p, m))
+        movie_pairs.extend((m, p))
+    del person_index, movie_index
+
+    person_offsets, person_movies = _csr(len(person_ids), person_pairs)
+    movie_offsets, movie_stars = _csr(len(movie_ids), movie_pairs)
+
+    names = NameIndex.build(person_names)
+
+    return CompactGraph(
+        person_ids, person_names, person_births,
+        movie_ids, movie_titles, movie_years,
+        person_offsets, person_movies,
+        movie_offsets, movie_stars,
+        names.order, names.trigram_keys,
+        names.trigram_offsets, names.trigram_postings
+    )
@@ -0,0 +1,132 @@
+import csv
+
+
+class Ingest():
+    """
+    Streams rows out of the people, movies and stars CSV files,
+    skipping filtered rows before anything is built from them.
+
+    Without filters, every person and movie is kept and only star rows
+    naming an unknown person or movie are dropped. With `min_year` or
+    `max_cast_size`, movies outside the limits are dropped along with
+    their star rows, and so is everyone left without a movie.
+
+    Counts of dropped rows are kept in `dropped`.
+    """
+
+    def __init__(self, directory, min_year=None, max_cast_size=None):
+        self.directory = directory
+        self.min_year = min_year
+        self.max_cast_size = max_cast_size
+        self.dropped = {"people": 0, "movies": 0, "stars": 0}
+
+        # Ids kept so far, or None until known
+        self.person_ids = None
+        self.movie_ids = None
+        if self.filtered():
+            self.prepare()
+
+    def filtered(self):
+        """
+        Returns True if any filter is set.
+        """
+        return self.min_year is not None or self.max_cast_size is not None
+
+    def filters(self):
+        """
+        Returns the filters as a dictionary, to tell loads apart.
+        """
+        return {"min_year": self.min_year, "max_cast_size": self.max_cast_size}
+
+    def rows(self, name, *columns):
+        """
+        Yields tuples of the given columns from one CSV file.
+        """
+        with open(f"{self.directory}/{name}", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            indices = [header.index(column) for column in columns]
+            for row in reader:
+                if row:
+                    yield tuple(row[i] for i in indices)
+
+    def prepare(self):
+        """
+        Works out which movies and people survive the filters, reading
+        only the movie and star columns that decide it.
+        """
+        movie_ids = set()
+        for movie_id, year in self.rows("movies.csv", "id", "year"):
+            if self.min_year is not None and not year_at_least(year, self.min_year):
+                continue
+            movie_ids.add(movie_id)
+
+        if self.max_cast_size is not None:
+            cast_sizes = dict.fromkeys(movie_ids, 0)
+            for _, movie_id in self.rows("stars.csv", "person_id", "movie_id"):
+                if movie_id in cast_sizes:
+                    cast_sizes[movie_id] += 1
+            movie_ids = {
+                movie_id for movie_id, size in cast_sizes.items()
+                if size <= self.max_cast_size
+            }
+            del cast_sizes
+
+        person_ids = set()
+        for person_id, movie_id in self.rows("stars.csv", "person_id", "movie_id"):
+            if movie_id in movie_ids:
+                person_ids.add(person_id)
+
+        self.movie_ids = movie_ids
+        self.person_ids = person_ids
+
+    def people(self):
+        """
+        Yields (id, name, birth) for every kept person.
+        """
+        keep = self.person_ids
+
+        # Only ids that were really yielded are kept, so that stars()
+        # drops rows naming someone missing from people.csv
+        self.person_ids = seen = set()
+        for person_id, name, birth in self.rows("people.csv", "id", "name", "birth"):
+            if keep is not None and person_id not in keep:
+                self.dropped["people"] += 1
+                continue
+            seen.add(person_id)
+            yield person_id, name, birth
+
+    def movies(self):
+        """
+        Yields (id, title, year) for every kept movie.
+        """
+        keep = self.movie_ids
+        self.movie_ids = seen = set()
+        for movie_id, title, year in self.rows("movies.csv", "id", "title", "year"):
+            if keep is not None and movie_id not in keep:
+                self.dropped["movies"] += 1
+                continue
+            seen.add(movie_id)
+            yield movie_id, title, year
+
+    def stars(self):
+        """
+        Yields (person_id, movie_id) for every star row whose person
+        and movie are both kept; people() and movies() must run first.
+        """
+        person_ids, movie_ids = self.person_ids, self.movie_ids
+        for person_id, movie_id in self.rows("stars.csv", "person_id", "movie_id"):
+            if person_id not in person_ids or movie_id not in movie_ids:
+                self.dropped["stars"] += 1
+                continue
+            yield person_id, movie_id
+
+
+def year_at_least(year, min_year):
+    """
+    Returns True if a year column is a number no smaller than min_year.
+    """
+    try:
+        return int(year) >= min_year
+    except ValueError:
+        return False
@@ -0,0 +1,226 @@
+import heapq
+import sys
+from itertools import count
+
+import degrees
+
+# Distances are stored in one byte, with this value for "not reachable"
+UNREACHABLE = 255
+
+# Stored for every reachable distance of FAR or more
+FAR = UNREACHABLE - 1
+
+
+class LandmarkIndex():
+    """
+    BFS distances from a few landmark people to everyone in a CompactGraph.
+
+    By the triangle inequality, for every landmark L
+        |d(L, s) - d(L, t)| <= d(s, t) <= d(L, s) + d(L, t)
+    which gives instant distance bounds and an admissible A* heuristic.
+    Distances capped at FAR still give valid lower bounds, but no upper
+    bound.
+    """
+
+    def __init__(self, graph, landmarks, distances):
+        self.graph = graph
+
+        # Person indices of the landmarks
+        self.landmarks = landmarks
+
+        # distances[i][p] is the distance from landmarks[i] to person p
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, k=8):
+        """
+        Builds an index over the k people with the most co-stars.
+        """
+        landmarks = sorted(
+            range(len(graph.person_ids)),
+            key=lambda p: costar_count(graph, p),
+            reverse=True
+        )[:k]
+        distances = [bfs_distances(graph, p) for p in landmarks]
+        return cls(graph, landmarks, distances)
+
+    def bounds(self, s, t):
+        """
+        Returns (lower, upper) bounds on the distance between person
+        indices s and t; lower is None if they are provably not connected
+        and upper is None if no landmark reaches both.
+        """
+        lower = 0
+        upper = None
+        for distance in self.distances:
+            ds, dt = distance[s], distance[t]
+            if ds == UNREACHABLE and dt == UNREACHABLE:
+                continue
+            if ds == UNREACHABLE or dt == UNREACHABLE:
+                return None, None
+            lower = max(lower, abs(ds - dt))
+            if ds != FAR and dt != FAR and (upper is None or ds + dt < upper):
+                upper = ds + dt
+        return lower, upper
+
+    def distance(self, source, target):
+        """
+        Returns the number of degrees between two person ids, or None
+        if they are not connected or are the same person, like
+        shortest_path. Searches only if the bounds differ.
+        """
+        s = self.graph.person_index(source)
+        t = self.graph.person_index(target)
+        if s == t:
+            return None
+        lower, upper = self.bounds(s, t)
+        if lower is None:
+            return None
+        if lower == upper:
+            return lower
+        path = self.shortest_path(source, target)
+        return None if path is None else len(path)
+
+    def shortest_path(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, or None, using A*
+        guided by the landmark lower bounds.
+
+        If `stats` is a dict, the number of explored people is stored
+        under "explored".
+        """
+        graph = self.graph
+        s = graph.person_index(source)
+        t = graph.person_index(target)
+        if stats is not None:
+            stats["explored"] = 0
+        if s == t:
+            return None
+        if self.bounds(s, t)[0] is None:
+            return None
+
+        target_distances = [
+            (distance, distance[t]) for distance in self.distances
+            if distance[t] != UNREACHABLE
+        ]
+
+        def estimate(p):
+            """Returns the largest landmark lower bound from p to t."""
+            best = 0
+            for distance, dt in target_distances:
+                dp = distance[p]
+                if dp != UNREACHABLE and abs(dp - dt) > best:
+                    best = abs(dp - dt)
+            return best
+
+        # Heap of (estimated total, -distance so far, tiebreak, person);
+        # among equal estimates the deepest person is expanded first
+        tiebreak = count()
+        heap = [(estimate(s), 0, next(tiebreak), s)]
+        best = {s: 0}
+        parents = {s: None}
+        closed = set()
+        explored = 0
+
+        while heap:
+            _, g, _, p = heapq.heappop(heap)
+            g = -g
+            if p in closed:
+                continue
+            closed.add(p)
+            explored += 1
+            if p == t:
+                break
+            for m, q in graph.neighbors(p):
+                if q in closed or best.get(q, g + 2) <= g + 1:
+                    continue
+                best[q] = g + 1
+                parents[q] = (m, p)
+                heapq.heappush(
+                    heap, (g + 1 + estimate(q), -(g + 1), next(tiebreak), q)
+                )
+
+        if stats is not None:
+            stats["explored"] = explored
+        if t not in closed:
+            return None
+
+        path = []
+        q = t
+        while parents[q] is not None:
+            m, p = parents[q]
+            path.append((graph.movie_ids[m], graph.person_ids[q]))
+            q = p
+        return path[::-1]
+
+
+def costar_count(graph, p):
+    """
+    Returns the number of (movie, co-star) pairs of person index p.
+    """
+    offsets = graph.movie_offsets
+    return sum(
+        offsets[m + 1] - offsets[m]
+        for m in graph.person_movies[graph.person_offsets[p]:graph.person_offsets[p + 1]]
+    )
+
+
+def bfs_distances(graph, source):
+    """
+    Returns a bytearray of BFS distances from person index `source`,
+    with FAR for distances of FAR or more.
+    """
+    distances = bytearray([UNREACHABLE]) * len(graph.person_ids)
+    distances[source] = 0
+    seen_movies = bytearray(len(graph.movie_ids))
+    person_offsets, person_movies = graph.person_offsets, graph.person_movies
+    movie_offsets, movie_stars = graph.movie_offsets, graph.movie_stars
+
+    frontier = [source]
+    depth = 0
+    while frontier:
+        depth = min(depth + 1, FAR)
+        next_frontier = []
+        for p in frontier:
+            for m in person_movies[person_offsets[p]:person_offsets[p + 1]]:
+                if seen_movies[m]:
+                    continue
+                seen_movies[m] = 1
+                for q in movie_stars[movie_offsets[m]:movie_offsets[m + 1]]:
+                    if distances[q] == UNREACHABLE:
+                        distances[q] = depth
+                        next_frontier.append(q)
+        frontier = next_frontier
+    return distances
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python landmarks.py [directory] [landmarks]")
+    directory = sys.argv[1] if len(sys.argv) > 1 else "large"
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    print("Loading data...")
+    degrees.load_data(directory, compact=True)
+    print("Data loaded.")
+    print("Building landmark index...")
+    index = LandmarkIndex.build(degrees.graph, k)
+    print("Index built.")
+
+    source = degrees.person_id_for_name(input("Name: "))
+    if source is None:
+        sys.exit("Person not found.")
+    target = degrees.person_id_for_name(input("Name: "))
+    if target is None:
+        sys.exit("Person not found.")
+
+    distance = index.distance(source, target)
+    if distance is None:
+        print("Not connected.")
+    else:
+        print(f"{distance} degrees of separation.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+from array import array
+from bisect import bisect_left
+
+
+class NameIndex():
+    """
+    Prefix and typo-tolerant lookup over a sequence of names.
+
+    Prefix search is a binary search over positions sorted by lowercase
+    name. Fuzzy search ranks names by how many character trigrams they
+    share with the query, using an inverted index stored as sorted
+    trigram keys plus CSR offset/posting arrays.
+    """
+
+    def __init__(self, names, order, trigram_keys, trigram_offsets,
+                 trigram_postings):
+        self.names = names
+
+        # Positions in `names` sorted by lowercase name
+        self.order = order
+
+        # Positions of names containing trigram_keys[k] are
+        # trigram_postings[trigram_offsets[k]:trigram_offsets[k + 1]]
+        self.trigram_keys = trigram_keys
+        self.trigram_offsets = trigram_offsets
+        self.trigram_postings = trigram_postings
+
+    @classmethod
+    def build(cls, names):
+        """
+        Builds the index for a sequence of names.
+        """
+        order = array("i", sorted(range(len(names)), key=lambda i: names[i].lower()))
+
+        postings = {}
+        for i, name in enumerate(names):
+            for trigram in trigrams(name):
+                if trigram not in postings:
+                    postings[trigram] = array("i")
+                postings[trigram].append(i)
+
+        trigram_keys = sorted(postings)
+        trigram_offsets = array("i", [0])
+        trigram_postings = array("i")
+        for trigram in trigram_keys:
+            trigram_postings.extend(postings[trigram])
+            trigram_offsets.append(len(trigram_postings))
+        return cls(names, order, trigram_keys, trigram_offsets, trigram_postings)
+
+    def _lower_bound(self, text):
+        """
+        Returns the first position in `order` whose name is >= text.
+        """
+        names = self.names
+        return bisect_left(self.order, text, key=lambda i: names[i].lower())
+
+    def exact(self, name):
+        """
+        Returns the positions of every name equal to `name`, ignoring case.
+        """
+        name = name.lower()
+        matches = []
+        i = self._lower_bound(name)
+        while i < len(self.order) and self.names[self.order[i]].lower() == name:
+            matches.append(self.order[i])
+            i += 1
+        return matches
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` positions of names starting with `prefix`,
+        ignoring case, in alphabetical order.
+        """
+        prefix = prefix.lower()
+        matches = []
+        i = self._lower_bound(prefix)
+        while i < len(self.order) and len(matches) < limit:
+            position = self.order[i]
+            if not self.names[position].lower().startswith(prefix):
+                break
+            matches.append(position)
+            i += 1
+        return matches
+
+    def postings(self, trigram):
+        """
+        Returns the positions of names containing a trigram.
+        """
+        k = bisect_left(self.trigram_keys, trigram)
+        if k == len(self.trigram_keys) or self.trigram_keys[k] != trigram:
+            return ()
+        return self.trigram_postings[self.trigram_offsets[k]:self.trigram_offsets[k + 1]]
+
+    def fuzzy(self, query, limit=10):
+        """
+        Returns up to `limit` (similarity, position) pairs for the names
+        sharing the most trigrams with `query`, best first.
+        """
+        wanted = trigrams(query)
+        if not wanted:
+            return []
+
+        # A name sharing at least half of the query's trigrams must contain
+        # one of its rarest ones, so only those postings are scanned; the
+        # common trigrams are then binary searched for each candidate
+        lists = sorted((self.postings(trigram) for trigram in wanted), key=len)
+        needed = max(1, len(wanted) // 2)
+        rare, common = lists[:len(wanted) - needed + 1], lists[len(wanted) - needed + 1:]
+        counts = {}
+        for postings in rare:
+            for position in postings:
+                counts[position] = counts.get(position, 0) + 1
+
+        shared = []
+        for position, count in counts.items():
+            for postings in common:
+                k = bisect_left(postings, position)
+                if k < len(postings) and postings[k] == position:
+                    count += 1
+            if count >= needed:
+                shared.append((count, position))
+
+        # Only the names sharing the most trigrams are scored exactly
+        shared.sort(key=lambda match: (-match[0], match[1]))
+        ranked = []
+        for count, position in shared[:4 * limit]:
+            found = len(trigrams(self.names[position]))
+            ranked.append((count / (len(wanted) + found - count), position))
+        ranked.sort(key=lambda match: (-match[0], match[1]))
+        return ranked[:limit]
+
+    def search(self, query, limit=10):
+        """
+        Returns up to `limit` positions ranked for autocomplete:
+        exact matches, then prefix matches, then fuzzy matches.
+        """
+        matches = []
+        for position in (self.exact(query) + self.prefix(query, limit)
+                         + [position for _, position in self.fuzzy(query, limit)]):
+            if position not in matches:
+                matches.append(position)
+        return matches[:limit]
+
+
+def trigrams(text):
+    """
+    Returns the set of lowercase character trigrams of a text,
+    padded so that word starts and ends count as well.
+    """
+    padded = f"  {' '.join(text.lower().split())} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
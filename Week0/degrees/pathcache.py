@@ -0,0 +1,130 @@
+import json
+import os
+from collections import OrderedDict
+
+VERSION = 1
+
+# Distinguishes "not cached" from a cached "not connected" (None) result
+MISSING = object()
+
+
+class PathCache():
+    """
+    LRU cache of shortest paths keyed by an unordered (source, target) pair.
+
+    A path is stored once, in the direction of its sorted key, and
+    reversed on lookup when asked for the other direction. Entries are
+    tied to a dataset fingerprint and dropped as soon as it changes.
+    """
+
+    def __init__(self, maxsize=1024, filename=None):
+        self.maxsize = maxsize
+        self.filename = filename
+        self.entries = OrderedDict()
+        self.dataset = None
+        self.hits = 0
+        self.misses = 0
+        if filename is not None:
+            self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def validate(self, dataset):
+        """
+        Clears the cache if it was filled from a different dataset.
+        """
+        if dataset != self.dataset:
+            self.entries.clear()
+            self.dataset = dataset
+
+    def get(self, source, target):
+        """
+        Returns the cached path from source to target, None if they are
+        cached as not connected, or MISSING if the pair is not cached.
+        """
+        key = (source, target) if source <= target else (target, source)
+        path = self.entries.get(key, MISSING)
+        if path is MISSING:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        self.entries.move_to_end(key)
+        if path is None or key[0] == source:
+            return list(path) if path is not None else None
+        return reverse_path(target, path)
+
+    def put(self, source, target, path):
+        """
+        Caches the path from source to target, evicting the least
+        recently used entry once the cache is full.
+        """
+        if self.maxsize <= 0:
+            return
+        if source <= target:
+            key = (source, target)
+        else:
+            key = (target, source)
+            path = None if path is None else reverse_path(source, path)
+        self.entries[key] = None if path is None else tuple(path)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def info(self):
+        """
+        Returns a dictionary of: hits, misses, size, maxsize.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.entries),
+            "maxsize": self.maxsize
+        }
+
+    def load(self):
+        """
+        Loads entries from `filename`, if it exists and is readable.
+        """
+        try:
+            with open(self.filename, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != VERSION or self.maxsize <= 0:
+            return
+        self.entries.clear()
+        self.dataset = data["dataset"]
+        for source, target, path in data["entries"][-self.maxsize:]:
+            if path is not None:
+                path = tuple(tuple(step) for step in path)
+            self.entries[(source, target)] = path
+
+    def save(self):
+        """
+        Writes all entries to `filename`, least recently used first.
+        """
+        data = {
+            "version": VERSION,
+            "dataset": self.dataset,
+            "entries": [
+                [source, target, path]
+                for (source, target), path in self.entries.items()
+            ]
+        }
+        temporary = f"{self.filename}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temporary, self.filename)
+
+
+def reverse_path(source, path):
+    """
+    Reverses a list of (movie_id, person_id) pairs starting at `source`
+    into the path from its last person back to `source`.
+    """
+    people = [source] + [person_id for _, person_id in path]
+    return [
+        (path[i][0], people[i])
+        for i in range(len(path) - 1, -1, -1)
+    ]
@@ -0,0 +1,166 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b"DEGSNAP\0"
+VERSION = 3
+FILENAME = "degrees.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# Magic, version, length of the JSON header that follows
+PREAMBLE = struct.Struct("<8sII")
+ALIGN = 8
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as one UTF-8 blob
+    plus an array of byte offsets into it.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    @classmethod
+    def build(cls, strings):
+        """
+        Packs a list of strings into a StringTable.
+        """
+        offsets = array("q", [0])
+        chunks = []
+        position = 0
+        for s in strings:
+            chunk = s.encode("utf-8")
+            chunks.append(chunk)
+            position += len(chunk)
+            offsets.append(position)
+        return cls(offsets, b"".join(chunks))
+
+
+def fingerprint(directory):
+    """
+    Returns the name, size and mtime of every source CSV file,
+    which a snapshot must match to be reused.
+    """
+    sources = []
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        sources.append([name, stat.st_size, stat.st_mtime_ns])
+    return sources
+
+
+def write_snapshot(directory, fields, filters=None, dropped=None):
+    """
+    Writes `fields`, a dict of arrays and lists of strings,
+    to a snapshot file next to the CSV files in `directory`,
+    along with the load filters and dropped row counts.
+    """
+    sections = []
+    for name, value in fields.items():
+        if isinstance(value, array):
+            sections.append((name, "array", [value]))
+        else:
+            table = value if isinstance(value, StringTable) else StringTable.build(value)
+            sections.append((name, "strings", [table.offsets, table.data]))
+
+    # Lay out every buffer at an aligned offset after the header
+    layout = {}
+    buffers = []
+    position = 0
+    for name, kind, parts in sections:
+        entries = []
+        for part in parts:
+            data = memoryview(part).cast("B")
+            typecode = part.typecode if isinstance(part, array) else "B"
+            entries.append([position, len(data), typecode])
+            buffers.append((position, data))
+            position += len(data)
+            position += -position % ALIGN
+        layout[name] = {"kind": kind, "buffers": entries}
+
+    header = json.dumps({
+        "byteorder": sys.byteorder,
+        "sources": fingerprint(directory),
+        "filters": filters,
+        "dropped": dropped,
+        "sections": layout
+    }).encode("utf-8")
+    start = PREAMBLE.size + len(header)
+    start += -start % ALIGN
+
+    path = os.path.join(directory, FILENAME)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for offset, data in buffers:
+            f.seek(start + offset)
+            f.write(data)
+        f.truncate(start + position)
+    os.replace(temporary, path)
+
+
+def read_snapshot(directory, filters=None):
+    """
+    Maps the snapshot in `directory` into memory and returns its
+    (fields, dropped row counts), or None if it is missing, from
+    another version, stale, or loaded with different filters.
+    """
+    path = os.path.join(directory, FILENAME)
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(buffer) < PREAMBLE.size:
+        return None
+    magic, version, length = PREAMBLE.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        return None
+    try:
+        sources = fingerprint(directory)
+    except OSError:
+        return None
+
+    # A truncated or corrupt file is treated like a missing one, so
+    # that the caller rebuilds it
+    try:
+        header = json.loads(buffer[PREAMBLE.size:PREAMBLE.size + length])
+        if (header["byteorder"] != sys.byteorder
+                or header["sources"] != sources
+                or header["filters"] != filters):
+            return None
+
+        start = PREAMBLE.size + length
+        start += -start % ALIGN
+        view = memoryview(buffer)
+        fields = {}
+        for name, section in header["sections"].items():
+            parts = []
+            for offset, size, typecode in section["buffers"]:
+                end = start + offset + size
+                if offset < 0 or size < 0 or end > len(buffer):
+                    return None
+                parts.append(view[start + offset:end].cast(typecode))
+            if section["kind"] == "array":
+                fields[name] = parts[0]
+            else:
+                fields[name] = StringTable(*parts)
+        return fields, header["dropped"]
+    except (ValueError, KeyError, TypeError, IndexError):
+        return None
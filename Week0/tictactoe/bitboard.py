@@ -0,0 +1,118 @@
+from tictactoe import X, O, EMPTY
+
+# A position is a pair (x, o) of 9-bit integers, with bit 3 * i + j set
+# when that player holds cell (i, j)
+
+ROWS = COLS = 3
+FULL = (1 << ROWS * COLS) - 1
+
+
+def win_masks(rows, cols, k):
+    """
+    Returns a bitmask for every line of k cells in a row, column or
+    diagonal of a rows x cols board.
+    """
+    masks = []
+    for i in range(rows):
+        for j in range(cols):
+            for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                if not (0 <= end_i < rows and 0 <= end_j < cols):
+                    continue
+                mask = 0
+                for step in range(k):
+                    mask |= 1 << (i + di * step) * cols + j + dj * step
+                masks.append(mask)
+    return masks
+
+
+WIN_MASKS = win_masks(ROWS, COLS, 3)
+
+# WINS[bits] is 1 if the cells in bits contain a winning line
+WINS = bytes(
+    any(bits & mask == mask for mask in WIN_MASKS) for bits in range(FULL + 1)
+)
+
+
+def from_board(board):
+    """
+    Returns the (x, o) bitboards of a list-of-lists board.
+    """
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << i * COLS + j
+            elif cell == O:
+                o |= 1 << i * COLS + j
+    return x, o
+
+
+def to_board(position):
+    """
+    Returns the list-of-lists board of (x, o) bitboards.
+    """
+    x, o = position
+    return [
+        [X if x >> i * COLS + j & 1 else O if o >> i * COLS + j & 1 else EMPTY
+         for j in range(COLS)]
+        for i in range(ROWS)
+    ]
+
+
+def player(position):
+    """
+    Returns player who has the next turn.
+    """
+    x, o = position
+    return O if x.bit_count() > o.bit_count() else X
+
+
+def actions(position):
+    """
+    Returns the list of available actions (i, j).
+    """
+    x, o = position
+    free = FULL & ~(x | o)
+    return [divmod(bit, COLS) for bit in range(ROWS * COLS) if free >> bit & 1]
+
+
+def result(position, action):
+    """
+    Returns the position after the current player moves at (i, j).
+    """
+    x, o = position
+    bit = 1 << action[0] * COLS + action[1]
+    if (x | o) & bit:
+        raise ValueError("cell is not empty")
+    if x.bit_count() > o.bit_count():
+        return x, o | bit
+    return x | bit, o
+
+
+def winner(position):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = position
+    if WINS[x]:
+        return X
+    if WINS[o]:
+        return O
+    return None
+
+
+def terminal(position):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = position
+    return bool(WINS[x] or WINS[o]) or x | o == FULL
+
+
+def utility(position):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = position
+    return 1 if WINS[x] else -1 if WINS[o] else 0
@@ -0,0 +1,42 @@
+import sys
+
+import tictactoe as ttt
+
+
+def build():
+    """
+    Solves every position reachable from the empty board and returns
+    the opening book as bytes, in the format read by tictactoe.load_book.
+    """
+    book = bytearray([ttt.UNKNOWN]) * 3 ** 9
+    seen = set()
+    boards = [ttt.initial_state()]
+    while boards:
+        board = boards.pop()
+        code = ttt.encode(board)
+        if code in seen or ttt.terminal(board):
+            continue
+        seen.add(code)
+
+        action = ttt.minimax(board, book=False)
+        child = ttt.result(board, action)
+        value = ttt.max_value(child) if ttt.player(child) == ttt.X else ttt.min_value(child)
+        book[code] = (value + 1) << 4 | 3 * action[0] + action[1]
+
+        boards.extend(ttt.result(board, action) for action in ttt.actions(board))
+    return bytes(book)
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python book.py [filename]")
+    filename = sys.argv[1] if len(sys.argv) == 2 else ttt.BOOK_FILE
+    book = build()
+    with open(filename, "wb") as f:
+        f.write(book)
+    positions = sum(entry != ttt.UNKNOWN for entry in book)
+    print(f"Wrote {positions} positions to {filename}.")
+
+
+if __name__ == "__main__":
+    main()
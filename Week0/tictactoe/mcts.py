@@ -0,0 +1,185 @@
+import importlib
+import math
+import random
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+import tictactoe
+
+
+class Node():
+    def __init__(self, state, parent, action, actions):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.children = {}
+        self.untried = list(actions)
+        self.visits = 0
+
+        # Sum of rewards for the player who moved into this node
+        self.wins = 0.0
+
+
+class MCTSPlayer():
+    """
+    Monte Carlo Tree Search (UCT) player for any game exposing the
+    tictactoe.py API: player, actions, result, terminal and utility.
+
+    `rules` is that API, either the tictactoe module or an object such
+    as mnk.MNKGame. Each move runs `iterations` simulations or runs for
+    `time_limit_ms`, whichever ends first. The tree below the chosen
+    move is kept and reused for the next move. With `processes`, that
+    many independent trees are searched in parallel and their root
+    visit counts are summed, without tree reuse.
+    """
+
+    def __init__(self, rules=tictactoe, iterations=None, time_limit_ms=None,
+                 exploration=math.sqrt(2), processes=None, seed=None):
+        if iterations is None and time_limit_ms is None:
+            iterations = 1000
+        self.rules = rules
+        self.iterations = iterations
+        self.time_limit_ms = time_limit_ms
+        self.exploration = exploration
+        self.processes = processes
+        self.rng = random.Random(seed)
+        self.root = None
+
+    def choose(self, state):
+        """
+        Returns the action to play in `state`, or None if the game is over.
+        """
+        if self.rules.terminal(state):
+            return None
+        if self.processes and self.processes > 1:
+            return self.choose_parallel(state)
+        root = self.reuse(state)
+        self.search(root)
+        best = max(root.children.values(), key=lambda child: child.visits)
+        self.root = best
+        best.parent = None
+        return best.action
+
+    def reuse(self, state):
+        """
+        Returns the node for `state` from the previous tree, searching
+        the two levels below the last chosen move, or a new root.
+        """
+        if self.root is not None:
+            if self.root.state == state:
+                return self.root
+            for child in self.root.children.values():
+                if child.state == state:
+                    child.parent = None
+                    return child
+                for grandchild in child.children.values():
+                    if grandchild.state == state:
+                        grandchild.parent = None
+                        return grandchild
+        return self.new_node(state, None, None)
+
+    def new_node(self, state, parent, action):
+        """
+        Returns an unexpanded node for `state`.
+        """
+        if self.rules.terminal(state):
+            return Node(state, parent, action, [])
+        actions = self.rules.actions(state)
+        self.rng.shuffle(actions)
+        return Node(state, parent, action, actions)
+
+    def search(self, root):
+        """
+        Runs simulations from `root` until the budget is used up.
+        """
+        deadline = None
+        if self.time_limit_ms is not None:
+            deadline = time.perf_counter() + self.time_limit_ms / 1000
+        count = 0
+        while True:
+            if self.iterations is not None and count >= self.iterations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self.simulate(root)
+            count += 1
+        return count
+
+    def simulate(self, root):
+        """
+        Runs one selection, expansion, rollout and backpropagation.
+        """
+        rules = self.rules
+
+        # Select down the tree while every child has been tried
+        node = root
+        while not node.untried and node.children:
+            node = self.select(node)
+
+        # Expand one untried action
+        if node.untried:
+            action = node.untried.pop()
+            child = self.new_node(rules.result(node.state, action), node, action)
+            node.children[action] = child
+            node = child
+
+        # Play randomly to the end of the game
+        state = node.state
+        while not rules.terminal(state):
+            state = rules.result(state, self.rng.choice(rules.actions(state)))
+        score = rules.utility(state)
+
+        # Credit every node with the result for the player who moved into it
+        while node is not None:
+            node.visits += 1
+            if node.parent is not None:
+                mover = rules.player(node.parent.state)
+                node.wins += (1 + (score if mover == tictactoe.X else -score)) / 2
+            node = node.parent
+
+    def select(self, node):
+        """
+        Returns the child of `node` with the highest UCT score.
+        """
+        log_visits = math.log(node.visits)
+        return max(
+            node.children.values(),
+            key=lambda child: (child.wins / child.visits
+                               + self.exploration * math.sqrt(log_visits / child.visits))
+        )
+
+    def choose_parallel(self, state):
+        """
+        Returns the most visited action over independent searches
+        run in separate processes.
+        """
+        rules = self.rules
+        if isinstance(rules, types.ModuleType):
+            rules = rules.__name__
+        seeds = [self.rng.randrange(2 ** 32) for _ in range(self.processes)]
+        jobs = [
+            (rules, state, self.iterations, self.time_limit_ms, self.exploration, seed)
+            for seed in seeds
+        ]
+        visits = {}
+        with ProcessPoolExecutor(self.processes) as executor:
+            for counts in executor.map(root_visits, jobs):
+                for action, count in counts.items():
+                    visits[action] = visits.get(action, 0) + count
+        self.root = None
+        return max(visits, key=visits.get)
+
+
+def root_visits(job):
+    """
+    Runs one independent search and returns its root visit counts.
+    """
+    rules, state, iterations, time_limit_ms, exploration, seed = job
+    if isinstance(rules, str):
+        rules = importlib.import_module(rules)
+    player = MCTSPlayer(rules, iterations=iterations, time_limit_ms=time_limit_ms,
+                        exploration=exploration, seed=seed)
+    root = player.new_node(state, None, None)
+    player.search(root)
+    return {action: child.visits for action, child in root.children.items()}
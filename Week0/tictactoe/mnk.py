@@ -0,0 +1,243 @@
+import time
+
+from bitboard import win_masks
+from tictactoe import X, O, EMPTY
+
+# Score of a win; wins found sooner score higher, and heuristic
+# estimates must stay well inside (-WIN, WIN)
+WIN = 1_000_000
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class MNKGame():
+    """
+    Generalized tic-tac-toe: k in a row wins on a rows x cols board.
+
+    Positions are (x, o) bitboards with bit cols * i + j for cell (i, j),
+    and the methods mirror the tictactoe.py API on them. best_move runs
+    an iterative-deepening alpha-beta search within a time budget.
+    """
+
+    def __init__(self, rows=3, cols=3, k=3, heuristic=None):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.full = (1 << rows * cols) - 1
+        self.masks = win_masks(rows, cols, k)
+        self.heuristic = heuristic or open_lines
+
+        # Lines through each cell, so a move only checks its own lines
+        self.cell_masks = [
+            [mask for mask in self.masks if mask >> cell & 1]
+            for cell in range(rows * cols)
+        ]
+
+        # Cells ordered from the center out, which tends to be strongest
+        center_i, center_j = (rows - 1) / 2, (cols - 1) / 2
+        self.order = sorted(
+            range(rows * cols),
+            key=lambda cell: (abs(cell // cols - center_i) + abs(cell % cols - center_j), cell)
+        )
+
+        # Statistics of the last best_move call
+        self.last_search = {}
+
+    def initial_state(self):
+        """
+        Returns the empty position.
+        """
+        return 0, 0
+
+    def from_board(self, board):
+        """
+        Returns the (x, o) position of a list-of-lists board.
+        """
+        x = o = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    x |= 1 << i * self.cols + j
+                elif cell == O:
+                    o |= 1 << i * self.cols + j
+        return x, o
+
+    def to_board(self, position):
+        """
+        Returns the list-of-lists board of an (x, o) position.
+        """
+        x, o = position
+        return [
+            [X if x >> i * self.cols + j & 1
+             else O if o >> i * self.cols + j & 1 else EMPTY
+             for j in range(self.cols)]
+            for i in range(self.rows)
+        ]
+
+    def player(self, position):
+        """
+        Returns player who has the next turn.
+        """
+        x, o = position
+        return O if x.bit_count() > o.bit_count() else X
+
+    def actions(self, position):
+        """
+        Returns the list of available actions (i, j).
+        """
+        x, o = position
+        taken = x | o
+        return [
+            divmod(cell, self.cols) for cell in range(self.rows * self.cols)
+            if not taken >> cell & 1
+        ]
+
+    def result(self, position, action):
+        """
+        Returns the position after the current player moves at (i, j).
+        """
+        x, o = position
+        bit = 1 << action[0] * self.cols + action[1]
+        if (x | o) & bit:
+            raise ValueError("cell is not empty")
+        if x.bit_count() > o.bit_count():
+            return x, o | bit
+        return x | bit, o
+
+    def winner(self, position):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        x, o = position
+        for mask in self.masks:
+            if x & mask == mask:
+                return X
+            if o & mask == mask:
+                return O
+        return None
+
+    def terminal(self, position):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        x, o = position
+        return self.winner(position) is not None or x | o == self.full
+
+    def utility(self, position):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        won = self.winner(position)
+        return 1 if won == X else -1 if won == O else 0
+
+    def best_move(self, position, time_limit_ms=1000, max_depth=None):
+        """
+        Returns the best action (i, j) found by iterative deepening
+        within time_limit_ms, or None if the game is over.
+
+        Each iteration searches one ply deeper than the last, starting
+        with the previous best move; an iteration cut short by the
+        deadline is discarded. Search stops early once a depth is
+        solved outright.
+        """
+        if self.terminal(position):
+            return None
+        x, o = position
+        me, them = (x, o) if self.player(position) == X else (o, x)
+        moves = [cell for cell in self.order if not (me | them) >> cell & 1]
+        max_depth = max_depth or len(moves)
+
+        self.deadline = time.perf_counter() + time_limit_ms / 1000
+        self.nodes = 0
+        self.best_replies = {}
+        best, score, depth = moves[0], None, 0
+        for depth in range(1, max_depth + 1):
+            self.horizon = False
+            try:
+                best, score = self.search_root(me, them, moves, best, depth)
+            except SearchTimeout:
+                depth -= 1
+                break
+            if not self.horizon or abs(score) >= WIN - self.rows * self.cols:
+                break
+
+        self.last_search = {"depth": depth, "score": score, "nodes": self.nodes}
+        return divmod(best, self.cols)
+
+    def search_root(self, me, them, moves, first, depth):
+        """
+        Searches every root move to `depth` plies, trying `first` first,
+        and returns (best cell, score for the player to move).
+        """
+        alpha, beta = -WIN - 1, WIN + 1
+        best = None
+        for cell in [first] + [cell for cell in moves if cell != first]:
+            score = self.child_score(me, them, cell, depth, alpha, beta, 0)
+            if best is None or score > alpha:
+                best, alpha = cell, max(alpha, score)
+        return best, alpha
+
+    def child_score(self, me, them, cell, depth, alpha, beta, ply):
+        """
+        Returns the score for the player to move after playing `cell`.
+        """
+        mine = me | 1 << cell
+        for mask in self.cell_masks[cell]:
+            if mine & mask == mask:
+                return WIN - ply
+        return -self.negamax(them, mine, depth - 1, -beta, -alpha, ply + 1)
+
+    def negamax(self, me, them, depth, alpha, beta, ply):
+        """
+        Returns the alpha-beta score of a position for the player to move,
+        whose cells are `me`, searching `depth` more plies.
+        """
+        self.nodes += 1
+        if self.nodes & 255 == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        taken = me | them
+        if taken == self.full:
+            return 0
+        if depth == 0:
+            self.horizon = True
+
+            # The side to move is X exactly when both have as many cells
+            if me.bit_count() == them.bit_count():
+                return self.heuristic(self, (me, them))
+            return -self.heuristic(self, (them, me))
+
+        key = (me, them)
+        moves = [cell for cell in self.order if not taken >> cell & 1]
+        reply = self.best_replies.get(key)
+        if reply is not None:
+            moves.remove(reply)
+            moves.insert(0, reply)
+
+        best = -WIN - 1
+        for cell in moves:
+            score = self.child_score(me, them, cell, depth, alpha, beta, ply)
+            if score > best:
+                best = score
+                self.best_replies[key] = cell
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        return best
+
+
+def open_lines(game, position):
+    """
+    Heuristic score of a position for X: every line still open to only
+    one player counts the square of that player's cells in it.
+    """
+    x, o = position
+    score = 0
+    for mask in game.masks:
+        if not o & mask:
+            score += (x & mask).bit_count() ** 2
+        elif not x & mask:
+            score -= (o & mask).bit_count() ** 2
+    return score
@@ -3,6 +3,7 @@ import sys
 import time
 
 import tictactoe as ttt
+from worker import AIWorker
 import os
 os.environ["SDL_VIDEODRIVER"] = "dummy"
 pygame.init()
@@ -20,12 +21,13 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+ai = AIWorker()
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            ai.shutdown()
             sys.exit()
 
     screen.fill(black)
@@ -109,15 +111,15 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, which is searched in the background
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
+            move = ai.move(board)
+            if move is not None:
                 board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+
+        # While the user thinks, search the replies to their possible moves
+        elif not game_over:
+            ai.speculate(board)
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -142,6 +144,6 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    ai.cancel()
 
     pygame.display.flip()
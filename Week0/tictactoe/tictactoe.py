@@ -1,17 +1,79 @@
 import math
+import os
+import threading
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Maps canonical board encodings to their minimax value, so positions
+# reached through different move orders, or symmetric to each other,
+# are only searched once
+transposition_table = {}
 
-def initial_state():
+# Maximum number of entries kept in transposition_table, or None for no limit
+table_size = None
+
+# Number of positions visited by the search, for measuring it
+nodes = 0
+
+# Holds the threading.Event that stops the search running on each thread
+search_stop = threading.local()
+
+# The 8 rotations and reflections of the board; SYMMETRIES[s][3 * i + j]
+# is the cell index that cell (i, j) moves to under symmetry s
+SYMMETRIES = [
+    tuple(3 * a + b for a, b in (move(i, j) for i in range(3) for j in range(3)))
+    for move in (
+        lambda i, j: (i, j),
+        lambda i, j: (j, 2 - i),
+        lambda i, j: (2 - i, 2 - j),
+        lambda i, j: (2 - j, i),
+        lambda i, j: (i, 2 - j),
+        lambda i, j: (2 - i, j),
+        lambda i, j: (j, i),
+        lambda i, j: (2 - j, 2 - i),
+    )
+]
+
+# The cells of the 8 rows, columns and diagonals of a 3x3 board
+LINES = (
+    [[(i, j) for j in range(3)] for i in range(3)]
+    + [[(i, j) for i in range(3)] for j in range(3)]
+    + [[(i, i) for i in range(3)], [(2 - i, i) for i in range(3)]]
+)
+
+# Opening book written by book.py: byte encode(board) of the file holds the
+# optimal action's cell index in its low 4 bits and value + 1 above them,
+# or UNKNOWN for boards that are unreachable or already over
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+UNKNOWN = 0xFF
+
+
+def load_book(filename=BOOK_FILE):
+    """
+    Returns the opening book's bytes, or None if it is missing or invalid.
+    """
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    return data if len(data) == 3 ** 9 else None
+
+
+opening_book = load_book()
+
+# Move ordering for alpha-beta search: center, then corners, then edges
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+
+def initial_state(rows=3, cols=3):
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return [[EMPTY] * cols for _ in range(rows)]
 
 # COMPLETE
 def player(board):
@@ -46,60 +108,44 @@ def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    new_board = [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
-    for i in range(len(board)):
-      for j in range(len(board[0])):
-        new_board[i][j] = board[i][j]
+    new_board = [list(row) for row in board]
     new_board[action[0]][action[1]] = player(board)
 
     return new_board
 
 
-def winner(board):
+def winner(board, k=3):
     """
-    Returns the winner of the game, if there is one.
+    Returns the winner of the game, if there is one: the player
+    holding k cells in a row, column or diagonal.
     """
-    for i in range(len(board)):
-        needed = board[i][0]
-        for j in range(1, len(board[0])):
-            if needed != board[i][j]:
-                break
-            elif j == 2:
-                # return winner
-                return board[i][j]
-                
-    for i in range(len(board)):
-        needed = board[0][i]
-        for j in range(1, len(board[0])):
-            if needed != board[j][i]:
-                break
-            elif j == 2:
-                # return winner
-                return board[j][i]  
-    
-    for i in range(1, len(board)):
-        needed = board[0][0]
-        if needed != board[i][i]:
-            break
-        elif i ==2:
-            return board[i][i]
-    for i in range(1, len(board)):
-        needed = board[len(board) - 1][0]
-        if needed != board[len(board) - 1 - i][i]:
-            break
-        elif i == 2:
-            return board[len(board) - 1 - i][i]        
-            
+    rows, cols = len(board), len(board[0])
+    if rows == 3 and cols == 3 and k == 3:
+        for (a, b), (c, d), (e, f) in LINES:
+            needed = board[a][b]
+            if needed is not EMPTY and needed == board[c][d] == board[e][f]:
+                return needed
+        return None
+    for i in range(rows):
+        for j in range(cols):
+            needed = board[i][j]
+            if needed == EMPTY:
+                continue
+            for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                if not (0 <= end_i < rows and 0 <= end_j < cols):
+                    continue
+                if all(board[i + di * step][j + dj * step] == needed
+                       for step in range(1, k)):
+                    return needed
     return None
 
 
-def terminal(board):
+def terminal(board, k=3):
     """
     Returns True if game is over, False otherwise.
     """
-    if winner(board) != None:
+    if winner(board, k) != None:
         return True
     for row in board:
         for cell in row:
@@ -108,11 +154,11 @@ def terminal(board):
     return True            
 
 
-def utility(board):
+def utility(board, k=3):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    won = winner(board)
+    won = winner(board, k)
     if won == X:
         return 1
     elif won == O:
@@ -122,49 +168,306 @@ def utility(board):
 
 
 
-def minimax(board):
+def encode(board):
+    """
+    Returns the board as a base-3 integer, one digit per cell.
+    """
+    code = 0
+    for row in board:
+        for cell in row:
+            code = code * 3 + (1 if cell == X else 2 if cell == O else 0)
+    return code
+
+
+def canonical_form(board):
+    """
+    Returns (key, symmetry) where key is the smallest encoding among the
+    8 symmetric versions of the board, and symmetry is the index in
+    SYMMETRIES that maps the board onto that version.
+    """
+    cells = [1 if cell == X else 2 if cell == O else 0 for row in board for cell in row]
+    best = None
+    for symmetry, permutation in enumerate(SYMMETRIES):
+        moved = [0] * 9
+        for i, cell in enumerate(cells):
+            moved[permutation[i]] = cell
+        code = 0
+        for cell in moved:
+            code = code * 3 + cell
+        if best is None or code < best[0]:
+            best = (code, symmetry)
+    return best
+
+
+def canonicalize(board):
+    """
+    Returns (canonical board, symmetry) where the canonical board is the
+    version of the board encoded by its canonical_key, and symmetry is
+    the index in SYMMETRIES that maps the board onto it.
+    """
+    symmetry = canonical_form(board)[1]
+    return transform(board, symmetry), symmetry
+
+
+def canonical_key(board):
+    """
+    Returns the encoding shared by the board and its symmetric versions.
+    """
+    return canonical_form(board)[0]
+
+
+def table_key(board, k=3):
+    """
+    Returns the board's transposition table key: its canonical_key, with
+    k added unless it is 3, or for boards other than 3x3 its encoding
+    together with its shape and k.
+    """
+    if len(board) != 3 or len(board[0]) != 3:
+        return len(board), len(board[0]), k, encode(board)
+    if k != 3:
+        return k, canonical_key(board)
+    return canonical_key(board)
+
+
+def transform(board, symmetry):
+    """
+    Returns the board rotated or reflected by SYMMETRIES[symmetry].
+    """
+    new_board = [[EMPTY, EMPTY, EMPTY],
+            [EMPTY, EMPTY, EMPTY],
+            [EMPTY, EMPTY, EMPTY]]
+    for i in range(3):
+        for j in range(3):
+            a, b = divmod(SYMMETRIES[symmetry][3 * i + j], 3)
+            new_board[a][b] = board[i][j]
+    return new_board
+
+
+def transform_action(action, symmetry):
+    """
+    Returns where action (i, j) moves to under SYMMETRIES[symmetry].
+    """
+    return divmod(SYMMETRIES[symmetry][3 * action[0] + action[1]], 3)
+
+
+def restore_action(action, symmetry):
+    """
+    Maps an action on a transformed board back to the original
+    orientation, undoing transform_action.
+    """
+    return divmod(SYMMETRIES[symmetry].index(3 * action[0] + action[1]), 3)
+
+
+def store(key, value):
+    """
+    Stores a value in the transposition table, evicting the oldest
+    entry once table_size is reached.
+    """
+    if table_size is not None:
+        if table_size <= 0:
+            return
+        while len(transposition_table) >= table_size:
+            del transposition_table[next(iter(transposition_table))]
+    transposition_table[key] = value
+
+
+class SearchStopped(Exception):
     """
-    Returns the optimal action for the current player_value on the board.
+    Raised when a search is stopped before it finishes.
     """
+
+
+def minimax(board, pruning=False, book=True, k=3, stop=None):
+    """
+    Returns the optimal action for the current player_value on the board,
+    where k in a row wins.
+
+    Positions in the opening book are answered by lookup unless `book`
+    is False. Otherwise, with `pruning`, uses alpha-beta search with move
+    ordering, which returns an optimal action but not always the same one.
+
+    Boards larger than 3x3 are too big to search to the end, so they are
+    handed to the time-limited search of mnk.MNKGame.
+
+    If `stop` is a threading.Event, the search raises SearchStopped soon
+    after it is set.
+    """
+    if stop is not None:
+        search_stop.event = stop
+        try:
+            return minimax(board, pruning, book, k)
+        finally:
+            search_stop.event = None
+    if len(board) * len(board[0]) > 9:
+        import mnk
+        game = mnk.MNKGame(len(board), len(board[0]), k)
+        return game.best_move(game.from_board(board))
+    if book and k == 3:
+        entry = book_entry(board)
+        if entry is not None:
+            return entry[0]
+    if pruning:
+        return alphabeta_minimax(board, k)
     actions_list = actions(board)
     optimal_action = None
     player_value = player(board)
     if player_value == 'X':
         max_val = -2;
         for action in actions_list:
-            new_max = min_value(result(board, action))
+            new_max = min_value(result(board, action), k)
             if max_val < new_max:
                 optimal_action = action
                 max_val = new_max
     elif player_value == 'O':
         min_val = 2;
         for action in actions_list:
-            new_min = max_value(result(board, action))
+            new_min = max_value(result(board, action), k)
             if min_val > new_min:
                 optimal_action = action
                 min_val = new_min   
     return optimal_action  
 
-def min_value(board):
-    if terminal(board):
-      return utility(board)
+def book_entry(board):
+    """
+    Returns (optimal action, value) for the board from the opening book,
+    or None if there is no book or no entry for the board.
+    """
+    if opening_book is None or len(board) != 3 or len(board[0]) != 3:
+        return None
+    entry = opening_book[encode(board)]
+    if entry == UNKNOWN:
+        return None
+    return divmod(entry & 0x0F, 3), (entry >> 4) - 1
+
+
+def alphabeta_minimax(board, k=3):
+    """
+    Returns an optimal action for the current player using alpha-beta
+    search, stopping as soon as a winning move is found.
+    """
+    optimal_action = None
+    if player(board) == X:
+        max_val = -2
+        for action in ordered_actions(board):
+            new_max = alphabeta(result(board, action), max_val, 2, k)
+            if max_val < new_max:
+                optimal_action = action
+                max_val = new_max
+            if max_val == 1:
+                break
+    else:
+        min_val = 2
+        for action in ordered_actions(board):
+            new_min = alphabeta(result(board, action), -2, min_val, k)
+            if min_val > new_min:
+                optimal_action = action
+                min_val = new_min
+            if min_val == -1:
+                break
+    return optimal_action
+
+
+def ordered_actions(board):
+    """
+    Returns the available actions in MOVE_ORDER, or in row order on
+    boards other than 3x3.
+    """
+    if len(board) != 3 or len(board[0]) != 3:
+        return actions(board)
+    return [(i, j) for i, j in MOVE_ORDER if board[i][j] == EMPTY]
+
+
+def alphabeta(board, alpha, beta, k=3):
+    """
+    Returns the minimax value of the board if it lies strictly between
+    alpha and beta; otherwise returns a bound on the wrong side of them.
+
+    Only exact values are stored in the transposition table.
+    """
+    global nodes
+    nodes += 1
+    if nodes & 255 == 0:
+        check_stop()
+    key = None
+    if table_size is None or table_size > 0:
+        key = table_key(board, k)
+        if key in transposition_table:
+            return transposition_table[key]
+    if terminal(board, k):
+        return utility(board, k)
+
+    lower, upper = alpha, beta
+    if player(board) == X:
+        value = -2
+        for action in ordered_actions(board):
+            value = max(value, alphabeta(result(board, action), alpha, beta, k))
+            alpha = max(alpha, value)
+            if alpha >= beta or value == 1:
+                break
+    else:
+        value = 2
+        for action in ordered_actions(board):
+            value = min(value, alphabeta(result(board, action), alpha, beta, k))
+            beta = min(beta, value)
+            if alpha >= beta or value == -1:
+                break
+
+    # A win for the player to move cannot be improved on, so it is exact
+    # even when it was found at the edge of the window
+    if lower < value < upper or value == (1 if player(board) == X else -1):
+        store(key, value)
+    return value
+
+
+def check_stop():
+    """
+    Raises SearchStopped if the search on this thread has been stopped.
+    """
+    stop = getattr(search_stop, "event", None)
+    if stop is not None and stop.is_set():
+        raise SearchStopped()
+
+
+def min_value(board, k=3):
+    global nodes
+    nodes += 1
+    if nodes & 255 == 0:
+        check_stop()
+    key = None
+    if table_size is None or table_size > 0:
+        key = table_key(board, k)
+        if key in transposition_table:
+            return transposition_table[key]
+    if terminal(board, k):
+      return utility(board, k)
     actions_list = actions(board)
     min_val = 2;
     for action in actions_list:
-      new_min = max_value(result(board, action))
+      new_min = max_value(result(board, action), k)
       if min_val > new_min:
         min_val = new_min  
+    store(key, min_val)
     return min_val
 
-def max_value(board):
-    if terminal(board):
-      return utility(board)
+def max_value(board, k=3):
+    global nodes
+    nodes += 1
+    if nodes & 255 == 0:
+        check_stop()
+    key = None
+    if table_size is None or table_size > 0:
+        key = table_key(board, k)
+        if key in transposition_table:
+            return transposition_table[key]
+    if terminal(board, k):
+      return utility(board, k)
     actions_list = actions(board)
     max_val = -2;
     for action in actions_list:
-      new_max = min_value(result(board, action))
+      new_max = min_value(result(board, action), k)
       if max_val < new_max:
         max_val = new_max
+    store(key, max_val)
     return max_val              
 
          
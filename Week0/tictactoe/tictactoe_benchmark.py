@@ -0,0 +1,134 @@
+import random
+import sys
+import time
+
+import tictactoe as ttt
+
+
+def ai_player(pruning=False, book=True):
+    """
+    Returns a player that picks moves with tictactoe.minimax.
+    """
+    def play(board):
+        return ttt.minimax(board, pruning=pruning, book=book)
+    return play
+
+
+def random_player(rng):
+    """
+    Returns a player that picks uniformly random moves.
+    """
+    def play(board):
+        return rng.choice(ttt.actions(board))
+    return play
+
+
+def play_game(x_player, o_player, latencies, timed=(ttt.X, ttt.O)):
+    """
+    Plays one game, appending the seconds each move of the `timed`
+    sides took to `latencies`, and returns the winner or None for a tie.
+    """
+    board = ttt.initial_state()
+    while not ttt.terminal(board):
+        side = ttt.player(board)
+        play = x_player if side == ttt.X else o_player
+        start = time.perf_counter()
+        action = play(board)
+        if side in timed:
+            latencies.append(time.perf_counter() - start)
+        board = ttt.result(board, action)
+    return ttt.winner(board)
+
+
+def percentile(values, fraction):
+    """
+    Returns the value at `fraction` of the way through sorted values.
+    """
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run(games, pruning=False, book=True, cold=False, seed=0):
+    """
+    Plays `games` AI-vs-AI games and `games` AI-vs-random games, with
+    the AI alternating sides against random, and returns a report.
+
+    With `cold`, the transposition table is cleared before every game.
+    """
+    rng = random.Random(seed)
+    ai = ai_player(pruning=pruning, book=book)
+    opponent = random_player(rng)
+    outcomes = {"ai_vs_ai": {}, "ai_vs_random": {"won": 0, "tied": 0, "lost": 0}}
+    latencies = []
+
+    ttt.nodes = 0
+    start = time.perf_counter()
+    for game in range(games):
+        if cold:
+            ttt.transposition_table.clear()
+        won = play_game(ai, ai, latencies)
+        outcomes["ai_vs_ai"][won] = outcomes["ai_vs_ai"].get(won, 0) + 1
+
+    for game in range(games):
+        if cold:
+            ttt.transposition_table.clear()
+        ai_side = ttt.X if game % 2 == 0 else ttt.O
+        if ai_side == ttt.X:
+            won = play_game(ai, opponent, latencies, timed=(ai_side,))
+        else:
+            won = play_game(opponent, ai, latencies, timed=(ai_side,))
+        result = "tied" if won is None else "won" if won == ai_side else "lost"
+        outcomes["ai_vs_random"][result] += 1
+    elapsed = time.perf_counter() - start
+
+    search_time = sum(latencies)
+    return {
+        "games": 2 * games,
+        "moves": len(latencies),
+        "moves_per_second": len(latencies) / search_time if search_time else 0,
+        "nodes": ttt.nodes,
+        "nodes_per_second": ttt.nodes / search_time if search_time else 0,
+        "p50": percentile(latencies, 0.5),
+        "p90": percentile(latencies, 0.9),
+        "p99": percentile(latencies, 0.99),
+        "max": max(latencies),
+        "seconds": elapsed,
+        "outcomes": outcomes
+    }
+
+
+def perfect(report):
+    """
+    Returns True if the AI drew every game against itself
+    and never lost to the random player.
+    """
+    outcomes = report["outcomes"]
+    return (set(outcomes["ai_vs_ai"]) == {None}
+            and outcomes["ai_vs_random"]["lost"] == 0)
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    flags = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    if len(args) > 1 or not flags <= {"--pruning", "--no-book", "--cold"}:
+        sys.exit("Usage: python tictactoe_benchmark.py [games] "
+                 "[--pruning] [--no-book] [--cold]")
+    games = int(args[0]) if args else 1000
+
+    report = run(games, pruning="--pruning" in flags,
+                 book="--no-book" not in flags, cold="--cold" in flags)
+    print(f"{report['games']} games, {report['moves']} AI moves "
+          f"in {report['seconds']:.3f}s")
+    print(f"{report['moves_per_second']:,.0f} moves/s, "
+          f"{report['nodes_per_second']:,.0f} nodes/s")
+    print("latency per move: " + ", ".join(
+        f"{name} {report[name] * 1e6:,.1f}us"
+        for name in ("p50", "p90", "p99", "max")
+    ))
+    print(f"outcomes: {report['outcomes']}")
+    if not perfect(report):
+        sys.exit("AI did not play perfectly.")
+
+
+if __name__ == "__main__":
+    main()
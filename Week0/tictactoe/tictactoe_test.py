@@ -1,5 +1,10 @@
 import pytest
 import tictactoe
+import bitboard
+import mcts
+import mnk
+import tictactoe_benchmark
+import worker
 X = "X"
 O = "O"
 EMPTY = None
@@ -66,3 +71,278 @@ def test_terminal():
     assert tictactoe.terminal(full_board)
     
             
+
+def test_minimax_blocks_and_wins():
+    block = [[X, X, EMPTY],
+            [O, EMPTY, EMPTY],
+            [EMPTY, EMPTY, EMPTY]]
+    win = [[X, X, EMPTY],
+            [O, O, EMPTY],
+            [X, EMPTY, EMPTY]]
+    assert tictactoe.minimax(block) == (0, 2)
+    assert tictactoe.minimax(win) == (1, 2)
+
+
+def test_transposition_table():
+    tictactoe.transposition_table.clear()
+    assert tictactoe.minimax(tictactoe.initial_state(), book=False) == (0, 0)
+    assert len(tictactoe.transposition_table) > 0
+
+
+def test_bounded_transposition_table():
+    tictactoe.transposition_table.clear()
+    tictactoe.table_size = 100
+    try:
+        assert tictactoe.minimax(tictactoe.initial_state(), book=False) == (0, 0)
+        assert len(tictactoe.transposition_table) <= 100
+    finally:
+        tictactoe.table_size = None
+        tictactoe.transposition_table.clear()
+
+
+opening = [[X, O, EMPTY],
+            [EMPTY, EMPTY, EMPTY],
+            [EMPTY, EMPTY, EMPTY]]
+
+
+def test_alphabeta_visits_fewer_nodes():
+    tictactoe.table_size = 0
+    try:
+        tictactoe.nodes = 0
+        plain = tictactoe.minimax(opening, pruning=False, book=False)
+        plain_nodes = tictactoe.nodes
+        tictactoe.nodes = 0
+        pruned = tictactoe.minimax(opening, pruning=True, book=False)
+        assert tictactoe.nodes < plain_nodes
+    finally:
+        tictactoe.table_size = None
+        tictactoe.transposition_table.clear()
+    plain_value = tictactoe.min_value(tictactoe.result(opening, plain))
+    pruned_value = tictactoe.min_value(tictactoe.result(opening, pruned))
+    assert plain_value == pruned_value == 1
+
+
+def test_bitboard_round_trip():
+    for board in (ver_win_1, hor_win_2, diag_win_1, full_board, opening):
+        assert bitboard.to_board(bitboard.from_board(board)) == board
+
+
+def test_bitboard_matches_tictactoe():
+    for board in (ver_win_1, ver_win_2, ver_win_3, hor_win_1, hor_win_2,
+                  hor_win_3, diag_win_1, diag_win_2, full_board, opening):
+        position = bitboard.from_board(board)
+        assert bitboard.player(position) == tictactoe.player(board)
+        assert bitboard.winner(position) == tictactoe.winner(board)
+        assert bitboard.terminal(position) == tictactoe.terminal(board)
+        assert bitboard.utility(position) == tictactoe.utility(board)
+        assert bitboard.actions(position) == tictactoe.actions(board)
+    position = bitboard.from_board(opening)
+    assert (bitboard.to_board(bitboard.result(position, (1, 1)))
+            == tictactoe.result(opening, (1, 1)))
+
+
+def test_winner_matches_bitboard_on_every_board():
+    for code in range(3 ** 9):
+        cells = [(EMPTY, X, O)[code // 3 ** i % 3] for i in range(9)]
+        board = [cells[3 * i:3 * i + 3] for i in range(3)]
+        position = bitboard.from_board(board)
+        x_wins = bitboard.winner((position[0], 0)) is not None
+        o_wins = bitboard.winner((0, position[1])) is not None
+        if not (x_wins and o_wins):
+            assert tictactoe.winner(board) == bitboard.winner(position)
+
+
+def test_winner_ignores_empty_lines():
+    board = [[EMPTY, EMPTY, EMPTY],
+            [O, O, EMPTY],
+            [X, X, X]]
+    assert tictactoe.winner(board) == X
+    assert tictactoe.winner(tictactoe.transform(board, 1)) == X
+
+
+def test_symmetric_boards_share_a_key():
+    keys = {tictactoe.canonical_key(tictactoe.transform(opening, symmetry))
+            for symmetry in range(len(tictactoe.SYMMETRIES))}
+    assert keys == {tictactoe.canonical_key(opening)}
+
+
+def test_canonical_action_maps_back():
+    for symmetry in range(len(tictactoe.SYMMETRIES)):
+        board = tictactoe.transform(opening, symmetry)
+        canonical, found = tictactoe.canonicalize(board)
+        assert tictactoe.transform(board, found) == canonical
+        for action in tictactoe.actions(board):
+            moved = tictactoe.transform_action(action, found)
+            assert canonical[moved[0]][moved[1]] == EMPTY
+            assert tictactoe.restore_action(moved, found) == action
+
+
+def test_larger_boards():
+    board = tictactoe.initial_state(4, 4)
+    assert len(board) == 4 and len(board[0]) == 4
+    for action in [(0, 1), (1, 1), (0, 2), (2, 2), (0, 3)]:
+        board = tictactoe.result(board, action)
+    assert tictactoe.winner(board, k=3) == X
+    assert tictactoe.winner(board, k=4) is None
+    assert tictactoe.utility(board, k=3) == 1
+
+
+def test_minimax_on_other_games():
+    board = tictactoe.initial_state(4, 4)
+    for action in [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2), (1, 2)]:
+        board = tictactoe.result(board, action)
+    assert tictactoe.minimax(board, k=4) == (0, 3)
+
+    # Two in a row on a 3x3 board: X wins on its second move
+    board = tictactoe.initial_state()
+    assert tictactoe.max_value(board, k=2) == 1
+    assert tictactoe.max_value(board) == 0
+    assert tictactoe.minimax(board, pruning=True, book=False, k=2) is not None
+
+
+def test_mnk_game_matches_tictactoe():
+    game = mnk.MNKGame()
+    for board in (ver_win_1, hor_win_2, diag_win_1, full_board, opening):
+        position = game.from_board(board)
+        assert game.to_board(position) == board
+        assert game.winner(position) == tictactoe.winner(board)
+        assert game.terminal(position) == tictactoe.terminal(board)
+        assert game.actions(position) == tictactoe.actions(board)
+
+
+def test_mnk_best_move():
+    game = mnk.MNKGame()
+    block = [[X, X, EMPTY],
+            [O, EMPTY, EMPTY],
+            [EMPTY, EMPTY, EMPTY]]
+    assert game.best_move(game.from_board(block), time_limit_ms=1000) == (0, 2)
+
+    game = mnk.MNKGame(4, 4, 3)
+    board = tictactoe.initial_state(4, 4)
+    for action in [(1, 1), (0, 0), (1, 2), (3, 3)]:
+        board = tictactoe.result(board, action)
+    move = game.best_move(game.from_board(board), time_limit_ms=100)
+    assert move in [(1, 0), (1, 3)]
+    assert game.last_search["depth"] >= 1
+
+
+def test_opening_book_matches_search():
+    assert tictactoe.opening_book is not None
+    board = tictactoe.initial_state()
+    while not tictactoe.terminal(board):
+        action, value = tictactoe.book_entry(board)
+        assert action == tictactoe.minimax(board, book=False)
+        assert value == 0
+        board = tictactoe.result(board, action)
+    assert tictactoe.winner(board) is None
+
+
+def test_missing_opening_book_falls_back_to_search():
+    book = tictactoe.opening_book
+    tictactoe.opening_book = None
+    try:
+        assert tictactoe.book_entry(opening) is None
+        assert tictactoe.minimax(opening) == tictactoe.minimax(opening, book=False)
+    finally:
+        tictactoe.opening_book = book
+    assert tictactoe.load_book("missing.bin") is None
+
+
+def test_self_play_benchmark():
+    report = tictactoe_benchmark.run(20)
+    assert tictactoe_benchmark.perfect(report)
+    assert report["moves"] > 0 and report["moves_per_second"] > 0
+
+    report = tictactoe_benchmark.run(2, pruning=True, book=False, cold=True)
+    assert tictactoe_benchmark.perfect(report)
+    assert report["nodes"] > 0
+    tictactoe.transposition_table.clear()
+
+
+def test_mcts_finds_forced_moves():
+    player = mcts.MCTSPlayer(iterations=2000, seed=0)
+    block = [[X, X, EMPTY],
+            [O, EMPTY, EMPTY],
+            [EMPTY, EMPTY, EMPTY]]
+    win = [[X, X, EMPTY],
+            [O, O, EMPTY],
+            [X, EMPTY, EMPTY]]
+    assert player.choose(block) == (0, 2)
+    assert mcts.MCTSPlayer(iterations=2000, seed=0).choose(win) == (1, 2)
+
+
+def test_mcts_on_finished_games():
+    won = [[X, X, X],
+           [O, O, EMPTY],
+           [EMPTY, EMPTY, EMPTY]]
+    assert mcts.MCTSPlayer(iterations=10, seed=0).choose(won) is None
+    assert mcts.MCTSPlayer(iterations=10, processes=2, seed=0).choose(won) is None
+
+
+def test_mcts_reuses_tree():
+    player = mcts.MCTSPlayer(iterations=500, seed=0)
+    board = tictactoe.initial_state()
+    board = tictactoe.result(board, player.choose(board))
+    board = tictactoe.result(board, tictactoe.actions(board)[0])
+    assert player.reuse(board).visits > 0
+
+
+def test_mcts_on_larger_boards():
+    game = mnk.MNKGame(4, 4, 3)
+    player = mcts.MCTSPlayer(game, time_limit_ms=50, seed=0)
+    position = game.initial_state()
+    assert player.choose(position) in game.actions(position)
+
+
+def test_mcts_parallel():
+    player = mcts.MCTSPlayer(iterations=300, processes=2, seed=0)
+    block = [[X, X, EMPTY],
+            [O, EMPTY, EMPTY],
+            [EMPTY, EMPTY, EMPTY]]
+    assert player.choose(block) == (0, 2)
+
+
+def test_ai_worker_runs_in_background():
+    ai = worker.AIWorker()
+    try:
+        ai.speculate(opening)
+        assert len(ai.jobs) == 7
+        reply = tictactoe.result(opening, (1, 1))
+        ai.request(reply).result(timeout=10)
+        assert list(ai.jobs) == [ai.key(reply)]
+        assert ai.move(reply) == tictactoe.minimax(reply)
+        ai.cancel()
+        assert ai.jobs == {}
+    finally:
+        ai.shutdown()
+
+
+def test_ai_worker_stops_searches():
+    def search(board, stop):
+        return tictactoe.minimax(board, book=False, stop=stop)
+
+    ai = worker.AIWorker(search)
+    tictactoe.table_size = 0
+    try:
+        board = tictactoe.initial_state()
+        running = ai.request(board)
+        while not running.running():
+            pass
+        ai.cancel()
+        with pytest.raises(tictactoe.SearchStopped):
+            running.result(timeout=10)
+    finally:
+        tictactoe.table_size = None
+        ai.shutdown()
+
+
+def test_ai_worker_survives_failed_searches():
+    def search(board, stop):
+        raise ValueError("search failed")
+
+    ai = worker.AIWorker(search)
+    try:
+        ai.request(opening).exception(timeout=10)
+        assert ai.move(opening) == tictactoe.actions(opening)[0]
+    finally:
+        ai.shutdown()
@@ -0,0 +1,108 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import tictactoe as ttt
+
+
+class AIWorker():
+    """
+    Runs AI searches on a background thread, so the pygame loop keeps
+    rendering while the computer is thinking.
+
+    Searches are keyed by board, so a reply that was computed
+    speculatively while the human was thinking is simply picked up
+    once that board is reached. Searches for boards that can no longer
+    be reached are dropped, so they never delay the one that is needed.
+
+    `search` is called as search(board, stop=event) and should give up,
+    raising an exception, soon after the threading.Event is set.
+    """
+
+    def __init__(self, search=ttt.minimax):
+        self.search = search
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.lock = threading.Lock()
+
+        # Maps each board's key to its search's (future, stop event)
+        self.jobs = {}
+
+    def key(self, board):
+        """
+        Returns a hashable key for a board.
+        """
+        return tuple(tuple(row) for row in board)
+
+    def request(self, board):
+        """
+        Starts a search for the board unless one is already queued,
+        and returns its future. Every other search is dropped, since
+        the game has reached this board.
+        """
+        return self.keep([board])[0]
+
+    def keep(self, boards):
+        """
+        Queues a search for each board that has none, drops and stops
+        the searches for all other boards, and returns the futures of
+        the boards' searches.
+        """
+        keys = [self.key(board) for board in boards]
+        with self.lock:
+            for key in set(self.jobs) - set(keys):
+                self.drop(key)
+            for key, board in zip(keys, boards):
+                if key not in self.jobs:
+                    snapshot = [list(row) for row in board]
+                    stop = threading.Event()
+                    future = self.executor.submit(self.search, snapshot, stop=stop)
+                    self.jobs[key] = (future, stop)
+            return [self.jobs[key][0] for key in keys]
+
+    def drop(self, key):
+        """
+        Cancels the search for a key if it is queued, or stops it if it
+        is running, and forgets it.
+        """
+        future, stop = self.jobs.pop(key)
+        future.cancel()
+        stop.set()
+
+    def move(self, board):
+        """
+        Returns the AI's action for the board if the search has finished,
+        starting it if needed, or None while it is still running. If the
+        search failed, falls back to the first available action.
+        """
+        future = self.request(board)
+        if not future.done():
+            return None
+        try:
+            return future.result()
+        except Exception:
+            return ttt.actions(board)[0]
+
+    def speculate(self, board):
+        """
+        Queues searches for the AI's reply to every move the human
+        could make on the board.
+        """
+        if ttt.terminal(board):
+            return
+        replies = [ttt.result(board, action) for action in ttt.actions(board)]
+        self.keep([reply for reply in replies if not ttt.terminal(reply)])
+
+    def cancel(self):
+        """
+        Drops every queued search and stops the running one, whose
+        result is then discarded.
+        """
+        with self.lock:
+            for key in list(self.jobs):
+                self.drop(key)
+
+    def shutdown(self):
+        """
+        Cancels queued searches and stops the background thread.
+        """
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
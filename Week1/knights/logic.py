@@ -1,8 +1,56 @@
 import itertools
+import weakref
+from multiprocessing import Pool
+
+import sat
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Maps the interned_key of each interned sentence to the sentence, so that
+# equal sentences intern to one shared object; entries are dropped once
+# nothing else refers to their sentence
+interned = weakref.WeakValueDictionary()
+
+# The (knowledge, query, backend) checked by a parallel_model_check worker
+worker_problem = None
+
+# Raised by eval when a compiled sentence nests too deeply for the parser
+COMPILE_ERRORS = (SyntaxError, MemoryError, RecursionError)
+
+# Number of symbols whose assignments are evaluated together in one
+# vectorized chunk; the remaining symbols are fixed per chunk
+CHUNK_SYMBOLS = 16
 
 
 class Sentence():
 
+    # Interned sentences cache their hash in _hash, which is None for all
+    # other sentences; since those can change, their hashes are recomputed
+    __slots__ = ("_hash", "__weakref__")
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_hash", None) is not None:
+            raise AttributeError("interned sentences cannot be changed")
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        # String hashes differ between processes, so cached hashes
+        # are left out of pickles
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+
+        # Unpickled copies of interned sentences are ordinary, changeable
+        # sentences again
+        self._hash = None
+        for name, value in state.items():
+            if isinstance(value, tuple):
+                value = list(value)
+            setattr(self, name, value)
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -15,6 +63,75 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def expression(self, index):
+        """Returns a Python expression evaluating the sentence over an
+        integer model `m`, where bit index[name] is the symbol's value."""
+        raise Exception("nothing to compile")
+
+    def table(self, columns, full):
+        """Evaluates the sentence over many models at once, given each
+        symbol's column of values and the all-true column `full`."""
+        raise Exception("nothing to evaluate")
+
+    def tseitin(self, cnf):
+        """Adds clauses defining the sentence to `cnf` and returns the
+        literal that is true exactly when the sentence is."""
+        raise Exception("nothing to encode")
+
+    def intern(self, memo=None):
+        """Returns the shared, immutable copy of the sentence. Interned
+        sentences that are equal are the same object, so comparing them
+        takes constant time. `memo` maps the ids of sentences already
+        interned in this call to their copies, so shared subformulas are
+        visited once."""
+        if memo is None:
+            memo = {}
+        if id(self) not in memo:
+            copy = self.interned_copy(memo)
+            key = copy.interned_key()
+            shared = interned.get(key)
+            if shared is None:
+
+                # Caching the hash also freezes the copy
+                object.__setattr__(copy, "_hash", hash(copy))
+                shared = interned[key] = copy
+            memo[id(self)] = shared
+        return memo[id(self)]
+
+    def interned_key(self):
+        """Returns a key for a sentence built from interned parts: its
+        class and the ids of its parts. The key holds no reference to
+        the parts, which the interned sentence keeps alive instead."""
+        key = [type(self)]
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, Sentence):
+                value = id(value)
+            elif isinstance(value, tuple):
+                value = tuple(id(part) for part in value)
+            key.append(value)
+        return tuple(key)
+
+    def interned_with(self, other):
+        """Checks if both sentences are interned, in which case they are
+        equal only if they are the same object."""
+        return (self._hash is not None
+                and getattr(other, "_hash", None) is not None)
+
+    def interned_copy(self, memo):
+        """Returns a new sentence like this one, built from interned
+        copies of its parts."""
+        raise Exception("nothing to intern")
+
+    def simplify(self, known):
+        """Returns an equivalent, simplified sentence, given the values of
+        the symbols in `known`. And() stands for true and Or() for false."""
+        raise Exception("nothing to simplify")
+
+    def size(self):
+        """Returns the number of nodes in the sentence."""
+        return 1
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -44,13 +161,20 @@ class Sentence():
 
 class Symbol(Sentence):
 
+    __slots__ = ("name",)
+
     def __init__(self, name):
+        self._hash = None
         self.name = name
 
     def __eq__(self, other):
+        if self is other or self.interned_with(other):
+            return self is other
         return isinstance(other, Symbol) and self.name == other.name
 
     def __hash__(self):
+        if self._hash is not None:
+            return self._hash
         return hash(("symbol", self.name))
 
     def __repr__(self):
@@ -68,16 +192,41 @@ class Symbol(Sentence):
     def symbols(self):
         return {self.name}
 
+    def expression(self, index):
+        return f"(m >> {index[self.name]} & 1)"
+
+    def table(self, columns, full):
+        return columns[self.name]
+
+    def tseitin(self, cnf):
+        return cnf.variable(self.name)
+
+    def interned_copy(self, memo):
+        return Symbol(self.name)
+
+    def simplify(self, known):
+        if self.name in known:
+            return And() if known[self.name] else Or()
+        return self
+
 
 class Not(Sentence):
+
+    __slots__ = ("operand",)
+
     def __init__(self, operand):
         Sentence.validate(operand)
+        self._hash = None
         self.operand = operand
 
     def __eq__(self, other):
+        if self is other or self.interned_with(other):
+            return self is other
         return isinstance(other, Not) and self.operand == other.operand
 
     def __hash__(self):
+        if self._hash is not None:
+            return self._hash
         return hash(("not", hash(self.operand)))
 
     def __repr__(self):
@@ -92,17 +241,44 @@ class Not(Sentence):
     def symbols(self):
         return self.operand.symbols()
 
+    def expression(self, index):
+        return f"(not {self.operand.expression(index)})"
+
+    def table(self, columns, full):
+        return full ^ self.operand.table(columns, full)
+
+    def tseitin(self, cnf):
+        return -cnf.literal(self.operand)
+
+    def interned_copy(self, memo):
+        return Not(self.operand.intern(memo))
+
+    def simplify(self, known):
+        return negate(self.operand.simplify(known))
+
+    def size(self):
+        return 1 + self.operand.size()
+
 
 class And(Sentence):
+
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
+        self._hash = None
         self.conjuncts = list(conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        if self is other or self.interned_with(other):
+            return self is other
+        return (isinstance(other, And)
+                and tuple(self.conjuncts) == tuple(other.conjuncts))
 
     def __hash__(self):
+        if self._hash is not None:
+            return self._hash
         return hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
         )
@@ -115,6 +291,8 @@ class And(Sentence):
 
     def add(self, conjunct):
         Sentence.validate(conjunct)
+        if self._hash is not None:
+            raise AttributeError("interned sentences cannot be changed")
         self.conjuncts.append(conjunct)
 
     def evaluate(self, model):
@@ -127,19 +305,73 @@ class And(Sentence):
                            for conjunct in self.conjuncts])
 
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        return set().union(*[conjunct.symbols() for conjunct in self.conjuncts])
+
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            conjunct.expression(index) for conjunct in self.conjuncts
+        ) + ")"
+
+    def table(self, columns, full):
+        result = full
+        for conjunct in self.conjuncts:
+            result = result & conjunct.table(columns, full)
+        return result
+
+    def tseitin(self, cnf):
+        literals = [cnf.literal(conjunct) for conjunct in self.conjuncts]
+        if len(literals) == 1:
+            return literals[0]
+        defined = cnf.new_variable()
+        for literal in literals:
+            cnf.clauses.append([-defined, literal])
+        cnf.clauses.append([defined] + [-literal for literal in literals])
+        return defined
+
+    def interned_copy(self, memo):
+        sentence = And()
+        sentence.conjuncts = tuple(conjunct.intern(memo)
+                                   for conjunct in self.conjuncts)
+        return sentence
+
+    def simplify(self, known):
+        conjuncts = {}
+        for conjunct in self.conjuncts:
+            conjunct = conjunct.simplify(known)
+            for part in (conjunct.conjuncts if isinstance(conjunct, And)
+                         else [conjunct]):
+                if is_false(part) or negate(part) in conjuncts:
+                    return Or()
+                conjuncts[part] = True
+        if len(conjuncts) == 1:
+            return next(iter(conjuncts))
+        return And(*conjuncts)
+
+    def size(self):
+        return 1 + sum(conjunct.size() for conjunct in self.conjuncts)
 
 
 class Or(Sentence):
+
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
+        self._hash = None
         self.disjuncts = list(disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        if self is other or self.interned_with(other):
+            return self is other
+        return (isinstance(other, Or)
+                and tuple(self.disjuncts) == tuple(other.disjuncts))
 
     def __hash__(self):
+        if self._hash is not None:
+            return self._hash
         return hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
         )
@@ -158,23 +390,77 @@ class Or(Sentence):
                             for disjunct in self.disjuncts])
 
     def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+        return set().union(*[disjunct.symbols() for disjunct in self.disjuncts])
+
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            disjunct.expression(index) for disjunct in self.disjuncts
+        ) + ")"
+
+    def table(self, columns, full):
+        result = full ^ full
+        for disjunct in self.disjuncts:
+            result = result | disjunct.table(columns, full)
+        return result
+
+    def tseitin(self, cnf):
+        literals = [cnf.literal(disjunct) for disjunct in self.disjuncts]
+        if len(literals) == 1:
+            return literals[0]
+        defined = cnf.new_variable()
+        for literal in literals:
+            cnf.clauses.append([defined, -literal])
+        cnf.clauses.append([-defined] + literals)
+        return defined
+
+    def interned_copy(self, memo):
+        sentence = Or()
+        sentence.disjuncts = tuple(disjunct.intern(memo)
+                                   for disjunct in self.disjuncts)
+        return sentence
+
+    def simplify(self, known):
+        disjuncts = {}
+        for disjunct in self.disjuncts:
+            disjunct = disjunct.simplify(known)
+            for part in (disjunct.disjuncts if isinstance(disjunct, Or)
+                         else [disjunct]):
+                if is_true(part) or negate(part) in disjuncts:
+                    return And()
+                disjuncts[part] = True
+        if len(disjuncts) == 1:
+            return next(iter(disjuncts))
+        return Or(*disjuncts)
+
+    def size(self):
+        return 1 + sum(disjunct.size() for disjunct in self.disjuncts)
 
 
 class Implication(Sentence):
+
+    __slots__ = ("antecedent", "consequent")
+
     def __init__(self, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
+        self._hash = None
         self.antecedent = antecedent
         self.consequent = consequent
 
     def __eq__(self, other):
+        if self is other or self.interned_with(other):
+            return self is other
         return (isinstance(other, Implication)
                 and self.antecedent == other.antecedent
                 and self.consequent == other.consequent)
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        if self._hash is not None:
+            return self._hash
+        return hash(("implies", hash(self.antecedent),
+                           hash(self.consequent)))
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -191,21 +477,72 @@ class Implication(Sentence):
     def symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
+    def expression(self, index):
+        antecedent = self.antecedent.expression(index)
+        consequent = self.consequent.expression(index)
+        return f"(not {antecedent} or {consequent})"
+
+    def table(self, columns, full):
+        antecedent = self.antecedent.table(columns, full)
+        return (full ^ antecedent) | self.consequent.table(columns, full)
+
+    def tseitin(self, cnf):
+        antecedent = cnf.literal(self.antecedent)
+        consequent = cnf.literal(self.consequent)
+        defined = cnf.new_variable()
+        cnf.clauses.append([-defined, -antecedent, consequent])
+        cnf.clauses.append([defined, antecedent])
+        cnf.clauses.append([defined, -consequent])
+        return defined
+
+    def interned_copy(self, memo):
+        return Implication(self.antecedent.intern(memo),
+                           self.consequent.intern(memo))
+
+    def simplify(self, known):
+        antecedent = self.antecedent.simplify(known)
+        consequent = self.consequent.simplify(known)
+        if is_false(antecedent) or is_true(consequent) or antecedent == consequent:
+            return And()
+
+        # A implies A or B, and A and B implies A
+        if ((isinstance(consequent, Or) and antecedent in consequent.disjuncts)
+                or (isinstance(antecedent, And)
+                    and consequent in antecedent.conjuncts)):
+            return And()
+        if is_true(antecedent):
+            return consequent
+        if is_false(consequent):
+            return negate(antecedent)
+        return Implication(antecedent, consequent)
+
+    def size(self):
+        return 1 + self.antecedent.size() + self.consequent.size()
+
 
 class Biconditional(Sentence):
+
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
+        self._hash = None
         self.left = left
         self.right = right
 
     def __eq__(self, other):
+        if self is other or self.interned_with(other):
+            return self is other
         return (isinstance(other, Biconditional)
                 and self.left == other.left
                 and self.right == other.right)
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        if self._hash is not None:
+            return self._hash
+        return hash(("biconditional", hash(self.left),
+                           hash(self.right)))
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -224,9 +561,76 @@ class Biconditional(Sentence):
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def expression(self, index):
+        left = self.left.expression(index)
+        right = self.right.expression(index)
+        return f"((not {left}) == (not {right}))"
+
+    def table(self, columns, full):
+        left = self.left.table(columns, full)
+        return full ^ (left ^ self.right.table(columns, full))
+
+    def tseitin(self, cnf):
+        left = cnf.literal(self.left)
+        right = cnf.literal(self.right)
+        defined = cnf.new_variable()
+        cnf.clauses.append([-defined, -left, right])
+        cnf.clauses.append([-defined, left, -right])
+        cnf.clauses.append([defined, left, right])
+        cnf.clauses.append([defined, -left, -right])
+        return defined
+
+    def interned_copy(self, memo):
+        return Biconditional(self.left.intern(memo), self.right.intern(memo))
+
+    def simplify(self, known):
+        left = self.left.simplify(known)
+        right = self.right.simplify(known)
+        if left == right:
+            return And()
+        if left == negate(right):
+            return Or()
+        for constant, other in ((left, right), (right, left)):
+            if is_true(constant):
+                return other
+            if is_false(constant):
+                return negate(other)
+        return Biconditional(left, right)
+
+    def size(self):
+        return 1 + self.left.size() + self.right.size()
+
+
+def model_check(knowledge, query, backend="enumerate", simplify=False,
+                processes=1, split=None):
+    """Checks if knowledge base entails query.
+
+    With `simplify`, both sentences are first simplified and the symbols
+    fixed by unit clauses of the knowledge base are pruned; see prune.
+    With more than one process, the models are split between them; see
+    parallel_model_check.
+
+    `backend` selects how models are enumerated:
+        "enumerate"  -- recursively build and evaluate every model dict
+        "compiled"   -- evaluate compiled Python code on integer models
+        "vectorized" -- evaluate all models as bitsets, a chunk at a time
+        "numpy"      -- like "vectorized", with NumPy boolean arrays
+        "sat"        -- prove knowledge and not query unsatisfiable
+    """
+    if simplify:
+        knowledge, query, _ = prune(knowledge, query)
+        if is_false(knowledge) or is_true(query):
+            return True
+    if processes > 1:
+        return parallel_model_check(knowledge, query, backend, processes, split)
+    if backend == "sat":
+        return sat_model_check(knowledge, query)
+    if backend == "compiled":
+        return compiled_model_check(knowledge, query)
+    if backend in ("vectorized", "numpy"):
+        return vectorized_model_check(knowledge, query, numpy=backend == "numpy")
+    if backend != "enumerate":
+        raise ValueError(f"unknown model_check backend {backend!r}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -262,3 +666,300 @@ def model_check(knowledge, query):
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
 
+
+
+def compile_sentence(sentence, symbols):
+    """Compiles a sentence into a function of an integer model,
+    in which bit i holds the value of symbols[i]. Sentences nested too
+    deeply for Python's parser are looked up in their truth table."""
+    try:
+        return eval(f"lambda m: {sentence.expression(symbol_index(symbols))}")
+    except COMPILE_ERRORS:
+        table = sentence.table(*symbol_columns(symbols))
+        return lambda m: table >> m & 1
+
+
+def compiled_model_check(knowledge, query):
+    """Checks if knowledge base entails query by running compiled
+    evaluators over every integer model. Sentences nested too deeply
+    for Python's parser are checked by vectorized_model_check."""
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    index = symbol_index(symbols)
+    try:
+        check = eval(
+            f"lambda m: not {knowledge.expression(index)}"
+            f" or {query.expression(index)}"
+        )
+    except COMPILE_ERRORS:
+        return vectorized_model_check(knowledge, query)
+    return all(check(m) for m in range(2 ** len(symbols)))
+
+
+def symbol_index(symbols):
+    """Maps each symbol name to its bit position."""
+    return {symbol: i for i, symbol in enumerate(symbols)}
+
+
+def symbol_columns(symbols, numpy=False):
+    """Returns (columns, full) for evaluating a chunk of 2 ** len(symbols)
+    models at once: model m sits at position m of every column, and the
+    column of symbols[i] is true wherever bit i of m is set."""
+    size = 2 ** len(symbols)
+    if numpy:
+        if np is None:
+            raise ImportError("the numpy backend requires NumPy")
+        models = np.arange(size, dtype=np.int64)
+        columns = {
+            symbol: (models >> i & 1).astype(bool)
+            for i, symbol in enumerate(symbols)
+        }
+        return columns, np.ones(size, dtype=bool)
+
+    columns = {}
+    for i, symbol in enumerate(symbols):
+
+        # Repeat a block of 2 ** i false then 2 ** i true models,
+        # doubling the pattern until it covers every model
+        column, width = ((1 << 2 ** i) - 1) << 2 ** i, 2 ** (i + 1)
+        while width < size:
+            column |= column << width
+            width *= 2
+        columns[symbol] = column
+    return columns, (1 << size) - 1
+
+
+def vectorized_model_check(knowledge, query, numpy=False):
+    """Checks if knowledge base entails query by evaluating the truth
+    table of both sentences, CHUNK_SYMBOLS symbols at a time."""
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    low, high = symbols[:CHUNK_SYMBOLS], symbols[CHUNK_SYMBOLS:]
+    columns, full = symbol_columns(low, numpy=numpy)
+    empty = full ^ full
+    for chunk in range(2 ** len(high)):
+        for i, symbol in enumerate(high):
+            columns[symbol] = full if chunk >> i & 1 else empty
+        counter_models = (knowledge.table(columns, full)
+                          & (full ^ query.table(columns, full)))
+        if counter_models.any() if numpy else counter_models:
+            return False
+    return True
+
+
+class CNF():
+    """
+    Clauses in conjunctive normal form, built from sentences with the
+    Tseitin encoding: each compound subformula gets a new variable defined
+    to be equivalent to it, so the clauses grow linearly with the sentence.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = {}
+        self.count = 0
+
+        # Maps each encoded subformula to its literal, so that repeated
+        # subformulas share one definition
+        self.literals = {}
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def variable(self, name):
+        """Returns the variable standing for the symbol called name."""
+        if name not in self.variables:
+            self.variables[name] = self.new_variable()
+        return self.variables[name]
+
+    def literal(self, sentence):
+        """Returns the literal equivalent to sentence, defining it if needed."""
+        if sentence not in self.literals:
+            self.literals[sentence] = sentence.tseitin(self)
+        return self.literals[sentence]
+
+    def add(self, sentence):
+        """Asserts that sentence is true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(disjunct)
+                                 for disjunct in sentence.disjuncts])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+
+def sat_model_check(knowledge, query):
+    """Checks if knowledge base entails query, by checking that no
+    assignment satisfies both the knowledge base and not query."""
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return sat.solve(cnf.clauses, cnf.count) is None
+
+
+class KnowledgeBase():
+    """
+    A conjunction of sentences that can grow one sentence at a time.
+
+    The symbol set, the compiled knowledge base and its satisfying models
+    are cached, so many queries are answered from a single enumeration
+    of the models.
+    """
+
+    def __init__(self, *sentences):
+        self.sentences = []
+        self.symbols = set()
+        self.order = None
+        self.models = None
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds a sentence, which the knowledge base then holds true."""
+        Sentence.validate(sentence)
+        self.sentences.append(sentence)
+        self.symbols |= sentence.symbols()
+        self.models = None
+
+    def satisfying_models(self):
+        """Returns the integer models, with bit i the value of symbol
+        order[i], in which every sentence is true."""
+        if self.models is None:
+            self.order = sorted(self.symbols)
+            check = compile_sentence(And(*self.sentences), self.order)
+            self.models = [m for m in range(2 ** len(self.order)) if check(m)]
+        return self.models
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+        Sentence.validate(query)
+        models = self.satisfying_models()
+
+        # Symbols the knowledge base says nothing about can take either
+        # value in each of its models, so they take the bits above it
+        extra = sorted(query.symbols() - self.symbols)
+        check = compile_sentence(query, self.order + extra)
+        shift = len(self.order)
+        return all(check(m | free << shift)
+                   for m in models for free in range(2 ** len(extra)))
+
+
+def intern(sentence):
+    """Returns the shared, immutable copy of sentence."""
+    return sentence.intern()
+
+
+def is_true(sentence):
+    """Checks if sentence is the constant And(), which is always true."""
+    return isinstance(sentence, And) and not sentence.conjuncts
+
+
+def is_false(sentence):
+    """Checks if sentence is the constant Or(), which is always false."""
+    return isinstance(sentence, Or) and not sentence.disjuncts
+
+
+def negate(sentence):
+    """Returns the negation of sentence, without double negations."""
+    if is_true(sentence):
+        return Or()
+    if is_false(sentence):
+        return And()
+    if isinstance(sentence, Not):
+        return sentence.operand
+    return Not(sentence)
+
+
+def unit(sentence):
+    """Returns (symbol name, value) if sentence is a symbol or a negated
+    symbol, None otherwise."""
+    if isinstance(sentence, Symbol):
+        return sentence.name, True
+    if isinstance(sentence, Not) and isinstance(sentence.operand, Symbol):
+        return sentence.operand.name, False
+    return None
+
+
+def simplify(sentence):
+    """
+    Flattens, deduplicates and folds constants in sentence, propagating
+    the symbol values asserted by its top-level unit clauses until none
+    are left. Returns (simplified sentence, known) where known maps each
+    propagated symbol to its value; sentence is equivalent to the
+    simplified sentence together with those values.
+    """
+    known = {}
+    while True:
+        sentence = sentence.simplify(known)
+        conjuncts = (sentence.conjuncts if isinstance(sentence, And)
+                     else [sentence])
+        units = [unit(conjunct) for conjunct in conjuncts]
+        units = dict(literal for literal in units if literal is not None)
+        if not units:
+            return sentence, known
+        known.update(units)
+
+
+def prune(knowledge, query):
+    """
+    Simplifies the knowledge base and substitutes the symbols it fixes
+    into the query, which preserves whether knowledge entails query.
+    Returns (knowledge, query, removed) where removed counts the
+    "symbols" and "nodes" no longer present in the two sentences.
+    """
+    symbols = len(set.union(knowledge.symbols(), query.symbols()))
+    nodes = knowledge.size() + query.size()
+    knowledge, known = simplify(knowledge)
+    query = query.simplify(known)
+    removed = {
+        "symbols": symbols - len(set.union(knowledge.symbols(), query.symbols())),
+        "nodes": nodes - knowledge.size() - query.size()
+    }
+    return knowledge, query, removed
+
+
+def parallel_model_check(knowledge, query, backend, processes, split=None):
+    """
+    Checks if knowledge base entails query by fixing the first `split`
+    symbols to each of their 2 ** split assignments, and checking those
+    sub-problems with `backend` in a pool of processes. Stops every worker
+    as soon as one sub-problem has a model where knowledge is true and
+    query is false.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    if split is None:
+
+        # A few sub-problems per process evens out their running times
+        split = (4 * processes - 1).bit_length()
+    fixed = symbols[:split]
+    cubes = (
+        {symbol: bool(cube >> i & 1) for i, symbol in enumerate(fixed)}
+        for cube in range(2 ** len(fixed))
+    )
+    with Pool(processes, initializer=init_worker,
+              initargs=(knowledge, query, backend)) as pool:
+        for entailed in pool.imap_unordered(check_cube, cubes):
+            if not entailed:
+                pool.terminate()
+                return False
+    return True
+
+
+def init_worker(knowledge, query, backend):
+    """
+    Stores the problem a parallel_model_check worker checks.
+    """
+    global worker_problem
+    worker_problem = (knowledge, query, backend)
+
+
+def check_cube(known):
+    """
+    Checks the worker's problem on the models agreeing with `known`.
+    """
+    knowledge, query, backend = worker_problem
+    knowledge = knowledge.simplify(known)
+    if is_false(knowledge):
+        return True
+    return model_check(knowledge, query.simplify(known), backend)
@@ -0,0 +1,219 @@
+import gc
+import pickle
+import random
+
+import pytest
+import logic
+import puzzle
+import sat
+from logic import (And, Biconditional, Implication, KnowledgeBase, Not, Or,
+                   Symbol, model_check)
+
+SYMBOLS = [Symbol(f"P{i}") for i in range(6)]
+BACKENDS = ["compiled", "vectorized", "sat"]
+if logic.np is not None:
+    BACKENDS.append("numpy")
+
+PUZZLES = [puzzle.knowledge0, puzzle.knowledge1, puzzle.knowledge2, puzzle.knowledge3]
+CHARACTERS = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+              puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+ANSWERS = [
+    [puzzle.AKnave],
+    [puzzle.AKnave, puzzle.BKnight],
+    [puzzle.AKnave, puzzle.BKnight],
+    [puzzle.AKnight, puzzle.BKnave, puzzle.CKnight]
+]
+
+
+def random_sentence(rng, depth):
+    """
+    Returns a random sentence over SYMBOLS, including empty And and Or.
+    """
+    if depth == 0 or rng.random() < 0.2:
+        symbol = rng.choice(SYMBOLS)
+        return Not(symbol) if rng.random() < 0.3 else symbol
+    kind = rng.randrange(5)
+    if kind == 0:
+        return Not(random_sentence(rng, depth - 1))
+    if kind == 1:
+        return And(*[random_sentence(rng, depth - 1) for _ in range(rng.randrange(4))])
+    if kind == 2:
+        return Or(*[random_sentence(rng, depth - 1) for _ in range(rng.randrange(4))])
+    if kind == 3:
+        return Implication(random_sentence(rng, depth - 1), random_sentence(rng, depth - 1))
+    return Biconditional(random_sentence(rng, depth - 1), random_sentence(rng, depth - 1))
+
+
+def random_problems(count, seed=0):
+    rng = random.Random(seed)
+    return [(random_sentence(rng, 4), random_sentence(rng, 3)) for _ in range(count)]
+
+
+def models():
+    for m in range(2 ** len(SYMBOLS)):
+        yield {symbol.name: bool(m >> i & 1) for i, symbol in enumerate(SYMBOLS)}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_match_enumerate(backend):
+    for knowledge, query in random_problems(500):
+        expected = model_check(knowledge, query)
+        assert model_check(knowledge, query, backend=backend) == expected
+
+
+@pytest.mark.parametrize("backend", ["enumerate"] + BACKENDS)
+def test_puzzle_answers(backend):
+    for knowledge, answer in zip(PUZZLES, ANSWERS):
+        entailed = [symbol for symbol in CHARACTERS
+                    if model_check(knowledge, symbol, backend=backend)]
+        assert entailed == answer
+
+
+def test_vectorized_chunks(monkeypatch):
+    monkeypatch.setattr(logic, "CHUNK_SYMBOLS", 2)
+    for knowledge, query in random_problems(200, seed=1):
+        expected = model_check(knowledge, query)
+        assert model_check(knowledge, query, backend="vectorized") == expected
+
+
+def test_sat_solver_matches_brute_force():
+    rng = random.Random(2)
+    for _ in range(200):
+        variables = 8
+        clauses = [
+            [rng.choice([1, -1]) * rng.randint(1, variables) for _ in range(3)]
+            for _ in range(rng.randint(10, 50))
+        ]
+        satisfiable = any(
+            all(any((literal > 0) == bool(m >> abs(literal) - 1 & 1) for literal in clause)
+                for clause in clauses)
+            for m in range(2 ** variables)
+        )
+        assignment = sat.solve(clauses, variables)
+        assert (assignment is not None) == satisfiable
+        if assignment is not None:
+            assert all(any(assignment[abs(literal)] == (literal > 0) for literal in clause)
+                       for clause in clauses)
+
+
+def test_sat_backend_scales():
+    chain = [Symbol(f"Q{i}") for i in range(200)]
+    knowledge = And(chain[0], *[Implication(a, b) for a, b in zip(chain, chain[1:])])
+    assert model_check(knowledge, chain[-1], backend="sat")
+    assert not model_check(knowledge, Not(chain[-1]), backend="sat")
+
+
+def test_knowledge_base_matches_model_check():
+    rng = random.Random(3)
+    for _ in range(100):
+        knowledge_base = KnowledgeBase()
+        added = []
+        for _ in range(3):
+            sentence = random_sentence(rng, 3)
+            knowledge_base.add(sentence)
+            added.append(sentence)
+            query = random_sentence(rng, 3)
+            assert knowledge_base.entails(query) == model_check(And(*added), query)
+
+
+def test_knowledge_base_enumerates_once(monkeypatch):
+    knowledge_base = KnowledgeBase(puzzle.knowledge0)
+    compiled = []
+    compile_sentence = logic.compile_sentence
+    monkeypatch.setattr(logic, "compile_sentence",
+                        lambda sentence, symbols: compiled.append(sentence)
+                        or compile_sentence(sentence, symbols))
+    entailed = [symbol for symbol in CHARACTERS if knowledge_base.entails(symbol)]
+    assert entailed == ANSWERS[0]
+    assert len(compiled) == len(CHARACTERS) + 1
+
+
+def test_equality_after_add():
+    a, b = Symbol("A"), Symbol("B")
+    conjunction = And(a)
+    negation = Not(conjunction)
+    hash(negation)
+    conjunction.add(b)
+    assert negation == Not(And(a, b))
+    assert Not(And(a, b)) in {negation}
+
+
+def test_interned_sentences_are_shared_and_frozen():
+    a, b = Symbol("A"), Symbol("B")
+    sentence = logic.intern(And(a, Not(b)))
+    assert sentence is logic.intern(And(Symbol("A"), Not(Symbol("B"))))
+    assert sentence == And(a, Not(b)) and And(a, Not(b)) == sentence
+    assert sentence != logic.intern(And(a, b))
+    with pytest.raises(AttributeError):
+        sentence.add(b)
+    with pytest.raises(AttributeError):
+        sentence.conjuncts[1].operand = a
+    copy = pickle.loads(pickle.dumps(sentence))
+    assert copy == sentence
+    copy.add(b)
+
+
+def test_interned_sentences_are_released():
+    sentence = logic.intern(And(Symbol("Released"), Not(Symbol("Released"))))
+    key = sentence.interned_key()
+    assert logic.interned[key] is sentence
+    del sentence
+    gc.collect()
+    assert key not in logic.interned
+
+
+def test_simplify_preserves_meaning():
+    for sentence, _ in random_problems(500, seed=4):
+        simplified, known = logic.simplify(sentence)
+        for model in models():
+            fixed = all(model[name] == value for name, value in known.items())
+            assert sentence.evaluate(model) == (fixed and simplified.evaluate(model))
+
+
+def test_prune_reports_removed_symbols_and_nodes():
+    a, b, c = SYMBOLS[:3]
+    knowledge = And(a, And(Implication(a, b), Not(Not(c))), Or(b, c))
+    simplified, query, removed = logic.prune(knowledge, Or(b, Not(c)))
+    assert logic.is_true(simplified) and logic.is_true(query)
+    assert removed["symbols"] == 3
+
+    # Only the two constants, one node each, are left
+    assert removed["nodes"] == knowledge.size() + Or(b, Not(c)).size() - 2
+    for knowledge, query in random_problems(300, seed=5):
+        expected = model_check(knowledge, query)
+        assert model_check(knowledge, query, backend="sat", simplify=True) == expected
+
+
+@pytest.mark.parametrize("backend", ["compiled", "sat"])
+def test_parallel_model_check(backend):
+    for knowledge, query in random_problems(10, seed=6):
+        expected = model_check(knowledge, query)
+        assert model_check(knowledge, query, backend=backend,
+                           processes=2, split=2) == expected
+
+
+def nested_sentence(depth):
+    """
+    Returns B and B => (B => ... (B => A)), nested depth times, which
+    entails A.
+    """
+    a, b = Symbol("A"), Symbol("B")
+    sentence = a
+    for _ in range(depth):
+        sentence = Implication(b, sentence)
+    return And(b, sentence)
+
+
+@pytest.mark.parametrize("backend", ["enumerate"] + BACKENDS)
+def test_deeply_nested_sentences(backend):
+    knowledge = nested_sentence(300)
+    assert model_check(knowledge, Symbol("A"), backend=backend)
+    assert not model_check(knowledge, Symbol("C"), backend=backend)
+
+
+def test_knowledge_base_with_deeply_nested_sentences():
+    knowledge_base = KnowledgeBase(nested_sentence(300))
+    assert knowledge_base.entails(Symbol("A"))
+    assert not knowledge_base.entails(Symbol("C"))
+    knowledge_base.add(Not(Symbol("A")))
+    assert knowledge_base.entails(Symbol("C"))
@@ -0,0 +1,210 @@
+"""
+A conflict-driven clause learning (CDCL) SAT solver.
+
+Clauses are lists of non-zero integers in DIMACS style: literal n stands
+for variable n being true and -n for it being false.
+"""
+
+# Factor by which variable activities decay after each conflict
+DECAY = 0.95
+
+
+def solve(clauses, variables):
+    """
+    Returns a satisfying assignment {variable: bool} for the clauses over
+    variables 1..variables, or None if they are unsatisfiable.
+    """
+    return Solver(clauses, variables).solve()
+
+
+class Solver():
+
+    def __init__(self, clauses, variables):
+        self.variables = variables
+        self.values = [None] * (variables + 1)
+        self.levels = [0] * (variables + 1)
+        self.reasons = [None] * (variables + 1)
+        self.activity = [0.0] * (variables + 1)
+        self.bump = 1.0
+
+        # Assigned literals in order, the trail length at each decision,
+        # and the next trail position to propagate
+        self.trail = []
+        self.limits = []
+        self.head = 0
+
+        # Maps each literal to the clauses watching it; every clause of
+        # two or more literals watches its first two
+        self.watches = {}
+        self.learned = 0
+        self.conflict = False
+        for clause in clauses:
+            self.add_clause(list(dict.fromkeys(clause)))
+
+    def add_clause(self, clause):
+        """
+        Adds an input clause, before solving starts.
+        """
+        if any(-literal in clause for literal in clause):
+            return
+        if not clause:
+            self.conflict = True
+        elif len(clause) == 1:
+            value = self.value(clause[0])
+            if value is False:
+                self.conflict = True
+            elif value is None:
+                self.assign(clause[0], None)
+        else:
+            self.watch(clause)
+
+    def watch(self, clause):
+        for literal in clause[:2]:
+            self.watches.setdefault(literal, []).append(clause)
+
+    def value(self, literal):
+        """
+        Returns True or False for an assigned literal, None otherwise.
+        """
+        value = self.values[abs(literal)]
+        if value is None:
+            return None
+        return value == (literal > 0)
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = literal > 0
+        self.levels[variable] = len(self.limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses. Returns a clause
+        with all literals false if there is a conflict, None otherwise.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches.get(false, [])
+            self.watches[false] = kept = []
+            for i, clause in enumerate(watching):
+
+                # Keep the false literal second, the other watch first
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) is True:
+                    kept.append(clause)
+                    continue
+
+                # Move the watch to any literal that is not false
+                for j in range(2, len(clause)):
+                    if self.value(clause[j]) is not False:
+                        clause[1], clause[j] = clause[j], clause[1]
+                        self.watches.setdefault(clause[1], []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self.value(clause[0]) is False:
+                        kept.extend(watching[i + 1:])
+                        return clause
+                    self.assign(clause[0], clause)
+        return None
+
+    def analyze(self, conflict):
+        """
+        Resolves the conflict back to its first unique implication point.
+        Returns (learned clause, level to backjump to); the first literal
+        of the learned clause is the one it asserts.
+        """
+        level = len(self.limits)
+        learned = [None]
+        seen = set()
+        pending = 0
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for literal in clause:
+                variable = abs(literal)
+                if variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.activity[variable] += self.bump
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(literal)
+
+            # Resolve on the latest current-level literal in the clause
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+        learned[0] = -literal
+
+        # Watch the literal from the highest remaining level second
+        backjump = 0
+        for i in range(1, len(learned)):
+            if self.levels[abs(learned[i])] > backjump:
+                backjump = self.levels[abs(learned[i])]
+                learned[1], learned[i] = learned[i], learned[1]
+        return learned, backjump
+
+    def backtrack(self, level):
+        """
+        Undoes every assignment made above the given decision level.
+        """
+        if level >= len(self.limits):
+            return
+        start = self.limits[level]
+        for literal in self.trail[start:]:
+            self.values[abs(literal)] = None
+            self.reasons[abs(literal)] = None
+        del self.trail[start:]
+        del self.limits[level:]
+        self.head = start
+
+    def decide(self):
+        """
+        Returns the unassigned variable with the highest activity, or
+        None if every variable is assigned.
+        """
+        best = None
+        for variable in range(1, self.variables + 1):
+            if self.values[variable] is None and (
+                    best is None or self.activity[variable] > self.activity[best]):
+                best = variable
+        return best
+
+    def solve(self):
+        if self.conflict:
+            return None
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.limits:
+                    return None
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) > 1:
+                    self.watch(learned)
+                self.assign(learned[0], learned)
+                self.learned += 1
+
+                # Favour variables from recent conflicts, rescaling
+                # before activities overflow
+                self.bump /= DECAY
+                if self.bump > 1e100:
+                    self.activity = [a * 1e-100 for a in self.activity]
+                    self.bump *= 1e-100
+                continue
+
+            variable = self.decide()
+            if variable is None:
+                return {v: self.values[v] for v in range(1, self.variables + 1)}
+            self.limits.append(len(self.trail))
+            self.assign(-variable, None)